@@ -6,14 +6,194 @@ incluyendo login, creación de usuarios y asignación de roles.
 """
 
 import asyncio
+import time
+from html.parser import HTMLParser
 from pathlib import Path
+from urllib.parse import urljoin, urlsplit
 from datetime import datetime
 from loguru import logger
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
+from playwright.async_api import (
+    async_playwright, Playwright, Page, Browser, BrowserContext, Route,
+    Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+)
 from app.config import get_settings
 
 settings = get_settings()
 
+_LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--mute-audio",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter",
+]
+
+# Recursos que no afectan el llenado de formularios. Los estilos se conservan
+# porque Select2 depende de ellos para mostrar/ocultar el dropdown.
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+# Asigna valores por id y notifica a los listeners del formulario
+_BULK_FILL_JS = """
+(fields) => {
+    for (const [id, value] of Object.entries(fields)) {
+        const el = document.getElementById(id);
+        if (!el) throw new Error(`Campo no encontrado: #${id}`);
+        el.value = value;
+        el.dispatchEvent(new Event("input", {bubbles: true}));
+        el.dispatchEvent(new Event("change", {bubbles: true}));
+    }
+}
+"""
+
+# Deja el formulario listo para otro usuario sin recargar la página. Se quitan
+# los errores del envío anterior para no confundirlos con los del siguiente.
+# form.reset() no actualiza los widgets Select2: se vacían vía jQuery, y si
+# jQuery no está disponible se retorna false para recargar el formulario.
+_FORM_RESET_JS = """
+() => {
+    const form = document.getElementById("form");
+    if (!form) return false;
+    const select2 = form.querySelectorAll("select.select2-hidden-accessible");
+    if (select2.length && !window.jQuery) return false;
+    document.querySelectorAll("ul.errorlist").forEach(el => el.remove());
+    form.reset();
+    select2.forEach(sel => window.jQuery(sel).val(null).trigger("change"));
+    return true;
+}
+"""
+
+# Opciones del select de roles (id -> nombre visible)
+_ROLE_OPTIONS_JS = """
+() => [...document.querySelectorAll("#id_groups option")]
+    .map(o => ({id: o.value, name: o.textContent.trim()}))
+"""
+
+# Selecciona el rol a través de la API de Select2 (jQuery) en un solo round-trip
+_SELECT_ROLE_JS = """
+(id) => {
+    const $ = window.jQuery;
+    if (!$) throw new Error("jQuery no disponible");
+    $("#id_groups").val([id]).trigger("change");
+}
+"""
+
+# Textos de enlace que la paginación usa para "página siguiente"
+_NEXT_PAGE_TEXTS = frozenset({"siguiente", "next", "»", "›", ">"})
+# Máximo de páginas del listado a recorrer (evita ciclos por enlaces mal formados)
+_MAX_LIST_PAGES = 200
+
+
+class _UsersTableParser(HTMLParser):
+    """
+    Extrae las celdas de las tablas y el enlace a la página siguiente de un listado HTML.
+
+    Cada fila queda como lista de textos; header_rows guarda las filas con <th>.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.rows: list[list[str]] = []
+        self.header_rows: list[list[str]] = []
+        self.next_href: str | None = None
+        self._row: list[str] | None = None
+        self._row_is_header = False
+        self._cell: list[str] | None = None
+        self._link_href: str | None = None
+        self._link_text: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "tr":
+            self._row, self._row_is_header = [], False
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+            self._row_is_header |= tag == "th"
+        elif tag == "a":
+            if "next" in (attrs.get("rel") or "").lower().split() and attrs.get("href"):
+                self.next_href = self.next_href or attrs["href"]
+            self._link_href, self._link_text = attrs.get("href"), []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None and self._row is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            (self.header_rows if self._row_is_header else self.rows).append(self._row)
+            self._row = None
+        elif tag == "a" and self._link_href:
+            if self.next_href is None and "".join(self._link_text).strip().lower() in _NEXT_PAGE_TEXTS:
+                self.next_href = self._link_href
+            self._link_href = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+        if self._link_href is not None:
+            self._link_text.append(data)
+
+
+# Playwright y navegadores compartidos por todos los clientes del proceso.
+# Arrancar Chromium cuesta 1-2 s, así que se lanza una vez y se reutiliza.
+_playwright: Playwright | None = None
+_browsers: dict[bool, Browser] = {}  # headless -> Browser
+_browser_lock = asyncio.Lock()
+
+
+async def get_browser(headless: bool = True) -> Browser:
+    """
+    Retorna el navegador compartido, lanzándolo la primera vez.
+
+    Args:
+        headless: Si True, usa chromium-headless-shell sin interfaz gráfica
+
+    Returns:
+        Navegador conectado, compartido entre clientes
+    """
+    global _playwright
+
+    async with _browser_lock:
+        browser = _browsers.get(headless)
+        if browser and browser.is_connected():
+            return browser
+
+        logger.info("Inicializando navegador...")
+        if _playwright is None:
+            _playwright = await async_playwright().start()
+
+        browser = await _playwright.chromium.launch(
+            # Desde Playwright 1.49, headless usa por defecto chromium-headless-shell
+            headless=headless,
+            args=_LAUNCH_ARGS
+        )
+        _browsers[headless] = browser
+        logger.info("✅ Navegador listo")
+        return browser
+
+
+async def shutdown_browser() -> None:
+    """
+    Cierra los navegadores compartidos y detiene Playwright.
+
+    Llamar una vez al terminar el proceso (o en el shutdown de la aplicación).
+    """
+    global _playwright
+
+    async with _browser_lock:
+        await asyncio.gather(
+            *(browser.close() for browser in _browsers.values()),
+            return_exceptions=True
+        )
+        _browsers.clear()
+
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
+            logger.info("✅ Navegador cerrado")
+
 
 class AppConnectoClient:
     """
@@ -23,85 +203,204 @@ class AppConnectoClient:
     usando Playwright para automatización web.
     """
 
-    def __init__(self, headless: bool = False, debug_screenshots: bool = False):
+    # Tipo de documento → valor del select #id_type_document
+    _DOC_TYPE_MAP = {
+        "C.C": "1",
+        "C.E": "2"
+    }
+
+    def __init__(
+        self,
+        headless: bool = True,
+        debug_screenshots: bool = False,
+        workers: int | None = None
+    ):
         """
         Inicializa el cliente de AppConnecto.
 
         Args:
-            headless: Si True, ejecuta el navegador en modo headless (sin interfaz gráfica)
+            headless: Si True (default), usa chromium-headless-shell sin interfaz gráfica.
+                      False muestra el navegador; solo para depurar.
             debug_screenshots: Si True, toma screenshots de todos los pasos (útil para debug)
+            workers: Contextos de navegador en paralelo para create_users
+                     (default: settings.appconnecto_workers)
         """
         self.headless = headless
         self.debug_screenshots = debug_screenshots
+        self.workers = max(1, workers or settings.appconnecto_workers)
         self.login_url = settings.appconnecto_url
         self.form_url = settings.appconnecto_form_url
+        self.users_list_url = settings.appconnecto_users_list_url
+        self.users_list_id_column = settings.appconnecto_users_list_id_column
+        self._direct_post = settings.appconnecto_direct_post  # Se apaga ante una respuesta inesperada
         self.username = settings.appconnecto_user
         self.password = settings.appconnecto_pass
+        self._birth_date = settings.appconnecto_default_birth_date
+        self._default_password = settings.appconnecto_default_password
 
-        self.playwright = None
-        self.browser: Browser | None = None
+        self.browser: Browser | None = None  # Compartido, ver get_browser()
         self.context: BrowserContext | None = None
         self.page: Page | None = None
+        self._contexts: list[BrowserContext] = []  # Contextos adicionales del pool
+        self._state_file = Path(settings.appconnecto_state_file)
+        self._session_restored = False  # True si el contexto se creó con sesión guardada
+        self._role_ids: dict[str, str] | None = None  # Rol -> id de opción en #id_groups
+        self._screenshot_tasks: set[asyncio.Task] = set()  # Capturas en segundo plano
 
         # Configuración de screenshots
         self.screenshots_dir = Path("screenshots")
         self.screenshots_dir.mkdir(exist_ok=True)
 
-    async def _take_screenshot(self, name: str) -> str:
+    async def _take_screenshot(self, name: str, page: Page | None = None) -> str:
         """
-        Toma una captura de pantalla (siempre).
+        Toma una captura de pantalla si están habilitadas.
+
+        Solo captura con settings.screenshots_enabled o debug_screenshots activos.
+        La captura (JPEG, solo viewport) se programa en segundo plano para no
+        bloquear el flujo y el archivo se escribe en un hilo del executor;
+        close() espera a que terminen las pendientes.
 
         Args:
             name: Nombre descriptivo para el screenshot
+            page: Página a capturar (default: self.page)
 
         Returns:
-            Ruta del archivo creado
+            Ruta del archivo (vacío si las capturas están deshabilitadas)
         """
-        if not self.page:
+        page = page or self.page
+        if not page or not (settings.screenshots_enabled or self.debug_screenshots):
             return ""
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = self.screenshots_dir / f"{name}_{timestamp}.png"
-        await self.page.screenshot(path=str(filename))
+        filename = self.screenshots_dir / f"{name}_{timestamp}.jpg"
+        task = asyncio.create_task(self._capture(page, filename))
+        self._screenshot_tasks.add(task)
+        task.add_done_callback(self._on_screenshot_done)
         logger.debug(f"📸 Captura: {filename}")
         return str(filename)
 
-    async def _take_debug_screenshot(self, name: str) -> str:
+    @staticmethod
+    async def _capture(page: Page, filename: Path) -> None:
+        """Captura en memoria y escribe el archivo en el executor por defecto, fuera del event loop."""
+        data = await page.screenshot(type="jpeg", quality=60, full_page=False)
+        await asyncio.get_running_loop().run_in_executor(None, filename.write_bytes, data)
+
+    def _on_screenshot_done(self, task: asyncio.Task) -> None:
+        """Libera la referencia a una captura terminada y reporta si falló."""
+        self._screenshot_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"⚠️  No se pudo guardar captura: {task.exception()}")
+
+    async def _take_debug_screenshot(self, name: str, page: Page | None = None) -> str:
         """
         Toma screenshot solo si debug_screenshots está activo.
 
         Args:
             name: Nombre descriptivo para el screenshot
+            page: Página a capturar (default: self.page)
 
         Returns:
             Ruta del archivo creado (vacío si debug_screenshots=False)
         """
         if self.debug_screenshots:
-            return await self._take_screenshot(name)
+            return await self._take_screenshot(name, page)
         return ""
 
     async def _init_browser(self) -> None:
-        """Inicializa el navegador y contexto de Playwright."""
-        if self.browser:
+        """Obtiene el navegador compartido y crea el contexto principal del cliente."""
+        if self.context:
             return
 
-        logger.info("Inicializando navegador...")
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=self.headless,
-            args=[
-                "--no-sandbox",
-                "--disable-dev-shm-usage",
-                "--disable-blink-features=AutomationControlled"
-            ]
-        )
+        self.browser = await get_browser(self.headless)
+        storage_state = self._saved_state_path()
+        self.context, self.page = await self._new_context(storage_state)
+        self._session_restored = storage_state is not None
 
-        self.context = await self.browser.new_context(
-            viewport={"width": 1920, "height": 1080}
+    def _saved_state_path(self) -> str | None:
+        """
+        Retorna la ruta de la sesión guardada si existe y no ha expirado.
+
+        Returns:
+            Ruta del archivo de estado, o None si no hay sesión reutilizable
+        """
+        try:
+            age_seconds = time.time() - self._state_file.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+        if age_seconds > settings.appconnecto_state_max_age_hours * 3600:
+            return None
+        return str(self._state_file)
+
+    async def _new_context(self, storage_state: str | None = None) -> tuple[BrowserContext, Page]:
+        """
+        Crea un contexto aislado del navegador compartido con su propia página.
+
+        Args:
+            storage_state: Archivo con cookies/localStorage a restaurar (opcional)
+
+        Returns:
+            Tupla (context, page)
+        """
+        context = await self.browser.new_context(
+            viewport={"width": 1920, "height": 1080},
+            storage_state=storage_state
         )
-        self.page = await self.context.new_page()
-        self.page.set_default_timeout(30000)  # 30 segundos
-        logger.info("✅ Navegador listo")
+        await context.route("**/*", self._block_heavy_resources)
+        page = await context.new_page()
+        # Un selector que falla no debe frenar el lote 30 s: las esperas de
+        # elementos usan timeouts cortos y solo la navegación tiene margen amplio
+        page.set_default_timeout(10000)
+        page.set_default_navigation_timeout(20000)
+        return context, page
+
+    @staticmethod
+    async def _goto(page: Page, url: str, tries: int = 2, backoff: float = 1.0) -> None:
+        """
+        Navega a una URL reintentando ante errores transitorios de red.
+
+        Args:
+            page: Página a navegar
+            url: URL destino
+            tries: Intentos totales
+            backoff: Segundos de espera antes de reintentar (se duplica en cada intento)
+        """
+        for attempt in range(1, tries + 1):
+            try:
+                await page.goto(url)
+                return
+            except PlaywrightError as e:
+                if attempt == tries:
+                    raise
+                logger.warning(f"⚠️  Navegación a {url} falló ({e}), reintentando...")
+                await asyncio.sleep(backoff)
+                backoff *= 2
+
+    @staticmethod
+    async def _block_heavy_resources(route: Route) -> None:
+        """Aborta imágenes, fuentes y multimedia; deja pasar el resto."""
+        if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _new_worker_context(self) -> Page | None:
+        """
+        Crea un contexto adicional para el pool de workers y hace login en él.
+
+        Cada contexto tiene sus propias cookies, por lo que necesita su propia sesión.
+
+        Returns:
+            Página autenticada, o None si el login falló
+        """
+        context, page = await self._new_context()
+        self._contexts.append(context)
+
+        if await self._login(page):
+            return page
+
+        logger.warning("⚠️  Worker descartado: login fallido en contexto adicional")
+        return None
 
     async def login(self) -> bool:
         """
@@ -118,45 +417,94 @@ class AppConnectoClient:
         """
         try:
             await self._init_browser()
+        except Exception as e:
+            logger.error(f"❌ Error inicializando navegador: {e}")
+            return False
+
+        if self._session_restored:
+            self._session_restored = False
+            if await self._is_session_valid(self.page):
+                logger.info("✅ Sesión guardada reutilizada, se omite el login")
+                return True
+            logger.info("Sesión guardada expirada, iniciando login...")
+
+        if not await self._login(self.page):
+            return False
+
+        await self._save_session()
+        return True
+
+    async def _is_session_valid(self, page: Page) -> bool:
+        """
+        Verifica la sesión abriendo el formulario: si redirige al login, expiró.
+
+        Args:
+            page: Página del contexto restaurado
+
+        Returns:
+            True si el formulario cargó sin redirigir al login
+        """
+        try:
+            await self._goto(page, self.form_url)
+            return "login" not in page.url.lower()
+        except Exception as e:
+            logger.debug(f"No se pudo verificar la sesión guardada: {e}")
+            return False
+
+    async def _save_session(self) -> None:
+        """Guarda cookies y localStorage del contexto principal para próximas ejecuciones."""
+        try:
+            await self.context.storage_state(path=str(self._state_file))
+        except Exception as e:
+            logger.warning(f"⚠️  No se pudo guardar la sesión: {e}")
+
+    async def _login(self, page: Page) -> bool:
+        """
+        Realiza el login en AppConnecto sobre una página concreta.
+
+        Args:
+            page: Página (de cualquier contexto) donde hacer login
+
+        Returns:
+            True si el login fue exitoso, False en caso contrario
+        """
+        try:
             logger.info("🔐 Iniciando sesión en AppConnecto...")
 
             # Navegar a la página de login
-            await self.page.goto(self.login_url)
-            await self.page.wait_for_load_state("networkidle")
-            await self.page.wait_for_selector("#username_val")
-            await self._take_debug_screenshot("01_pagina_login")
+            await self._goto(page, self.login_url)
+            await page.wait_for_load_state("networkidle")
+            await page.wait_for_selector("#username_val", timeout=5000)
+            await self._take_debug_screenshot("01_pagina_login", page)
 
             # Llenar credenciales
             logger.info(f"   Usuario: {self.username}")
-            await self.page.fill("#username_val", self.username)
-            await self.page.fill("#password", self.password)
+            await page.fill("#username_val", self.username)
+            await page.fill("#password", self.password)
 
             # Aceptar términos y condiciones
-            await self.page.check("#tyc")
+            await page.check("#tyc")
 
-            await self._take_debug_screenshot("02_credenciales_ingresadas")
+            await self._take_debug_screenshot("02_credenciales_ingresadas", page)
 
             # Click en botón de login
-            await self.page.click("#btn-login")
-
-            # Esperar a que redirija
-            await asyncio.sleep(2)
-            await self._take_debug_screenshot("03_despues_login")
+            await page.click("#btn-login")
 
-            # Verificar si el login fue exitoso
-            current_url = self.page.url
-            if "login" not in current_url.lower():
-                logger.info("✅ Login exitoso")
-                return True
+            # Esperar a que redirija fuera de la página de login
+            try:
+                await page.wait_for_url(lambda url: "login" not in url.lower(), timeout=15000)
+            except PlaywrightTimeoutError:
+                await self._take_debug_screenshot("03_despues_login", page)
+                logger.error("❌ Login fallido - Aún en página de login")
+                return False
 
-            logger.error("❌ Login fallido - Aún en página de login")
-            return False
+            await self._take_debug_screenshot("03_despues_login", page)
+            logger.info("✅ Login exitoso")
+            return True
 
         except Exception as e:
-            logger.error(f"❌ Error durante el login: {e}")
-            await self._take_screenshot("error_login")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"❌ Error durante el login: {e}")
+            await self._take_screenshot("error_login", page)
             return False
 
     def _map_vinculation_to_role(self, vinculation_type: str) -> str:
@@ -187,13 +535,71 @@ class AppConnectoClient:
         Returns:
             Valor para el select ("1" o "2")
         """
-        mapping = {
-            "C.C": "1",
-            "C.E": "2"
-        }
-        return mapping.get(type_document, "1")
+        return self._DOC_TYPE_MAP.get(type_document, "1")
+
+    async def _bulk_fill(self, page: Page, fields: dict[str, str]) -> None:
+        """
+        Llena varios campos del formulario con una sola llamada a page.evaluate.
+
+        Asigna cada valor por id y dispara los eventos input/change para que
+        los listeners del formulario vean el cambio igual que con page.fill().
+        Los valores viajan como argumento, no interpolados en el JavaScript.
+
+        Args:
+            page: Página con el formulario cargado
+            fields: Diccionario id_del_elemento -> valor
+        """
+        await page.evaluate(_BULK_FILL_JS, fields)
+
+    async def _load_role_ids(self, page: Page) -> dict[str, str]:
+        """
+        Obtiene (una sola vez por cliente) el mapeo rol -> id del select de roles.
+
+        Args:
+            page: Página de asignación de roles
+
+        Returns:
+            Diccionario nombre del rol -> valor de la opción
+        """
+        if self._role_ids is None:
+            options = await page.evaluate(_ROLE_OPTIONS_JS)
+            self._role_ids = {o["name"]: o["id"] for o in options if o["id"]}
+            logger.debug(f"Roles disponibles en AppConnecto: {list(self._role_ids)}")
+        return self._role_ids
 
-    async def create_user(self, user_data: dict) -> dict:
+    async def _select_role(self, page: Page, rol: str) -> None:
+        """
+        Selecciona el rol del usuario en el Select2 de la página de roles.
+
+        Si el rol está entre las opciones del select se asigna vía jQuery en
+        una sola llamada; si no (p. ej. opciones cargadas por AJAX) se usa el
+        flujo de interfaz: abrir dropdown, buscar y elegir la primera opción.
+
+        Args:
+            page: Página de asignación de roles
+            rol: Nombre del rol en AppConnecto
+        """
+        selection = page.locator(".select2-selection--multiple")
+        await selection.wait_for(timeout=5000)
+
+        role_id = (await self._load_role_ids(page)).get(rol)
+        if role_id:
+            try:
+                await page.evaluate(_SELECT_ROLE_JS, role_id)
+                return
+            except Exception as e:
+                logger.debug(f"Selección de rol vía jQuery falló, usando la interfaz: {e}")
+
+        search = page.locator(".select2-search__field")
+        await selection.click()
+        await search.wait_for(state="visible", timeout=3000)
+        await search.fill(rol)
+        # Esperar a que Select2 termine de filtrar (desaparece "Buscando…")
+        option = page.locator(".select2-results__option:not(.loading-results)").first
+        await option.wait_for(timeout=3000)
+        await option.click()
+
+    async def create_user(self, user_data: dict, page: Page | None = None) -> dict:
         """
         Crea un usuario en AppConnecto.
 
@@ -205,6 +611,7 @@ class AppConnectoClient:
                 - type_document: Tipo de documento ("C.C" o "C.E")
                 - institutional_email: Email institucional
                 - vinculation_type: Tipo de vinculación ("Estudiante" o "Docente")
+            page: Página autenticada a usar (default: self.page)
 
         Returns:
             Diccionario con resultado:
@@ -223,89 +630,103 @@ class AppConnectoClient:
             ...     "vinculation_type": "Estudiante"
             ... })
         """
-        username = user_data.get("identification_id", "unknown")
+        username, fields, rol = self._normalize_user(user_data)
+        return await self._create_user(username, fields, rol, page or self.page)
 
-        try:
-            logger.info(f"👤 Creando usuario: {username} ({user_data.get('full_name')} {user_data.get('full_last_name')})")
+    def _normalize_user(self, user_data: dict) -> tuple[str, dict[str, str], str]:
+        """
+        Convierte los datos de un usuario al formato que consume el formulario.
 
-            # 1. Navegar al formulario
-            await self.page.goto(self.form_url)
-            await self.page.wait_for_load_state("networkidle")
-            await self.page.wait_for_selector("#form")
+        Args:
+            user_data: Diccionario con datos del usuario (ver create_user)
 
-            url_before = self.page.url
+        Returns:
+            Tupla (username, campos id_elemento -> valor, rol en AppConnecto)
+        """
+        username = user_data.get("identification_id", "unknown")
+        fields = {
+            "id_username": username,
+            "id_identification_id": username,
+            "id_type_document": self._map_document_type(user_data.get("type_document", "C.C")),
+            "id_first_name": user_data.get("full_name", ""),
+            "id_last_name": user_data.get("full_last_name", ""),
+            "id_birth_date": self._birth_date,
+            "id_email": user_data.get("institutional_email", ""),
+            "id_password_field": self._default_password,
+        }
+        rol = self._map_vinculation_to_role(user_data.get("vinculation_type", "Estudiante"))
+        return username, fields, rol
 
-            # 2. Llenar formulario
-            await self.page.fill("#id_username", username)
-            await self.page.fill("#id_identification_id", username)
+    def _normalize_users(self, users: list[dict]) -> list[tuple[str, dict[str, str], str]]:
+        """
+        Normaliza el lote completo una sola vez antes de repartirlo entre workers.
+
+        Args:
+            users: Lista de diccionarios con datos de usuarios
 
-            # Seleccionar tipo de documento
-            document_type_value = self._map_document_type(user_data.get("type_document", "C.C"))
-            await self.page.select_option("#id_type_document", document_type_value)
+        Returns:
+            Lista de tuplas (username, campos del formulario, rol)
+        """
+        return [self._normalize_user(user_data) for user_data in users]
 
-            await self.page.fill("#id_first_name", user_data.get("full_name", ""))
-            await self.page.fill("#id_last_name", user_data.get("full_last_name", ""))
+    async def _create_user(self, username: str, fields: dict[str, str], rol: str, page: Page) -> dict:
+        """
+        Crea un usuario ya normalizado usando la página indicada.
 
-            # Llenar fecha de nacimiento usando JavaScript
-            await self.page.evaluate(
-                f"document.getElementById('id_birth_date').value = '{settings.appconnecto_default_birth_date}'"
-            )
+        Args:
+            username: identification_id del usuario
+            fields: Campos del formulario (id_elemento -> valor)
+            rol: Rol a asignar en AppConnecto
+            page: Página autenticada a usar
 
-            await self.page.fill("#id_email", user_data.get("institutional_email", ""))
-            await self.page.fill("#id_password_field", settings.appconnecto_default_password)
+        Returns:
+            Diccionario con resultado (ver create_user)
+        """
+        try:
+            logger.info(f"👤 Creando usuario: {username} ({fields['id_first_name']} {fields['id_last_name']})")
 
-            await self._take_debug_screenshot(f"formulario_lleno_{username}")
+            # 1-4. Enviar: POST directo si está disponible, si no por el formulario
+            outcome = await self._submit_via_request(fields, page) if self._direct_post else None
+            if outcome == "already_exists":
+                logger.warning(f"⚠️  Usuario ya existe en AppConnecto: {username}")
+                return {
+                    "success": False,
+                    "username": username,
+                    "status": "already_exists",
+                    "error": "El usuario ya existe"
+                }
 
-            # 3. Hacer scroll y enviar
-            logger.info("📤 Enviando formulario...")
-            await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await asyncio.sleep(1)
+            redirected = outcome == "created" or await self._submit_via_form(fields, page, username)
 
-            # Click con JavaScript
-            await self.page.evaluate("document.getElementById('enviar').click()")
+            if redirected is None:
+                logger.error(f"❌ {username} quedó creado sin confirmación del servidor; falta asignar el rol")
+                await self._take_screenshot(f"error_unconfirmed_{username}", page)
+                return {
+                    "success": False,
+                    "username": username,
+                    "status": "error",
+                    "error": "El servidor no respondió a tiempo, pero el usuario figura en AppConnecto: asignar el rol manualmente"
+                }
 
-            # 4. Esperar respuesta del servidor: navegación o error
-            try:
-                # Esperar a que la URL cambie (máximo 3 segundos)
-                await self.page.wait_for_url(lambda url: url != url_before, timeout=3000)
-                url_changed = True
-            except Exception:
-                # Timeout: la URL no cambió
-                url_changed = False
-
-            # 5. Verificar si la URL cambió (usuario creado exitosamente)
-            if url_changed:
+            # 5. Redirección = usuario creado exitosamente
+            if redirected:
                 # Usuario creado exitosamente, continuar con página 2 (asignar rol)
                 logger.info(f"✅ Usuario creado, asignando rol...")
-                await self._take_debug_screenshot(f"pagina2_{username}")
+                await self._take_debug_screenshot(f"pagina2_{username}", page)
 
                 # 6. Seleccionar rol
-                rol = self._map_vinculation_to_role(user_data.get("vinculation_type", "Estudiante"))
                 logger.info(f"👥 Seleccionando rol: {rol}")
-                await asyncio.sleep(1)
-
-                # Abrir dropdown de Select2
-                await self.page.click(".select2-selection--multiple")
-                await asyncio.sleep(1)
-
-                # Escribir en el campo de búsqueda
-                await self.page.fill(".select2-search__field", rol)
-                await asyncio.sleep(0.5)
-
-                # Click en la primera opción
-                await self.page.click(".select2-results__option")
+                await self._select_role(page, rol)
 
                 # 7. Guardar cambios
                 logger.info("💾 Guardando usuario...")
 
-                await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await asyncio.sleep(0.5)
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
 
-                await self.page.evaluate("document.querySelector('button[name=\"enviar\"]').click()")
-                await asyncio.sleep(2)
+                await page.evaluate("document.querySelector('button[name=\"enviar\"]').click()")
+                await page.wait_for_load_state("networkidle")
 
                 logger.info(f"✅ Usuario creado exitosamente: {username}")
-                await self._take_debug_screenshot(f"guardado_{username}")
 
                 return {
                     "success": True,
@@ -315,13 +736,16 @@ class AppConnectoClient:
                 }
 
             else:
-                # La URL NO cambió, verificar si hay mensaje de error
-                error_element = await self.page.query_selector("ul.errorlist li")
-                if error_element:
-                    error_text = await error_element.text_content()
+                # Sin redirección, verificar si el formulario trae mensaje de error
+                error_element = page.locator("ul.errorlist li").first
+                try:
+                    error_text = await error_element.text_content(timeout=2000)
+                except PlaywrightTimeoutError:
+                    error_text = None
+                if error_text:
                     if "ya existe" in error_text.lower():
                         logger.warning(f"⚠️  Usuario ya existe en AppConnecto: {username}")
-                        await self._take_screenshot(f"already_exists_{username}")
+                        await self._take_screenshot(f"already_exists_{username}", page)
                         return {
                             "success": False,
                             "username": username,
@@ -329,21 +753,19 @@ class AppConnectoClient:
                             "error": error_text
                         }
 
-                # URL no cambió y no hay errorlist conocido = error desconocido
+                # Sin redirección y sin errorlist conocido = error desconocido
                 logger.error(f"❌ Error desconocido creando usuario {username}")
-                await self._take_screenshot(f"error_unknown_{username}")
+                await self._take_screenshot(f"error_unknown_{username}", page)
                 return {
                     "success": False,
                     "username": username,
                     "status": "error",
-                    "error": "La URL no cambió y no se encontró mensaje de error conocido"
+                    "error": "El servidor no redirigió y no se encontró mensaje de error conocido"
                 }
 
         except Exception as e:
-            logger.error(f"❌ Error creando usuario {username}: {e}")
-            await self._take_screenshot(f"error_{username}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"❌ Error creando usuario {username}: {e}")
+            await self._take_screenshot(f"error_{username}", page)
             return {
                 "success": False,
                 "username": username,
@@ -351,6 +773,193 @@ class AppConnectoClient:
                 "error": str(e)
             }
 
+    def _is_created_redirect(self, location: str) -> bool:
+        """
+        Indica si una redirección tras el POST apunta a la página posterior a la creación.
+
+        Con la sesión expirada Django responde al POST con un 302 al login, y
+        un formulario rechazado puede redirigir de vuelta a sí mismo; ninguno
+        de los dos significa que el usuario se haya creado.
+
+        Args:
+            location: URL de destino (absoluta o relativa al formulario)
+
+        Returns:
+            True solo si el destino no es el login ni el propio formulario
+        """
+        target = urljoin(self.form_url, location)
+        if "login" in target.lower():
+            return False
+
+        def path_of(url: str) -> str:
+            return urlsplit(url).path.rstrip("/")
+
+        return path_of(target) not in {path_of(self.form_url), path_of(self.login_url)}
+
+    async def _submit_via_request(self, fields: dict[str, str], page: Page) -> str | None:
+        """
+        Envía el formulario de creación como un POST directo, sin renderizar el DOM.
+
+        El POST viaja por page.request, que comparte las cookies del contexto;
+        el token CSRF se toma de la cookie csrftoken. Si la respuesta no es la
+        esperada, el envío directo se desactiva para el resto del lote y el
+        llamador usa el flujo por formulario.
+
+        Args:
+            fields: Campos del formulario (id_elemento -> valor)
+            page: Página autenticada a usar; si se crea el usuario, queda en la página de roles
+
+        Returns:
+            "created", "already_exists" o None si hay que usar el formulario
+        """
+        cookies = await page.context.cookies(self.form_url)
+        csrf_token = next((c["value"] for c in cookies if c["name"] == "csrftoken"), None)
+        if not csrf_token:
+            logger.info("Sin cookie csrftoken, se usa el formulario para crear usuarios")
+            self._direct_post = False
+            return None
+
+        # Los campos del formulario usan el id "id_<name>" que genera Django
+        form = {element_id.removeprefix("id_"): value for element_id, value in fields.items()}
+        form["csrfmiddlewaretoken"] = csrf_token
+        origin = "{0.scheme}://{0.netloc}".format(urlsplit(self.form_url))
+
+        response = await page.request.post(
+            self.form_url,
+            form=form,
+            headers={"Referer": self.form_url, "Origin": origin},
+            max_redirects=0
+        )
+
+        location = response.headers.get("location")
+        if 300 <= response.status < 400 and location and self._is_created_redirect(location):
+            await self._goto(page, urljoin(self.form_url, location))
+            return "created"
+
+        if response.status == 200 and "ya existe" in (await response.text()).lower():
+            return "already_exists"
+
+        logger.info(f"Envío directo respondió {response.status}, se usa el formulario para crear usuarios")
+        self._direct_post = False
+        return None
+
+    async def _submit_via_form(self, fields: dict[str, str], page: Page, username: str) -> bool | None:
+        """
+        Llena y envía el formulario de creación desde el DOM.
+
+        Args:
+            fields: Campos del formulario (id_elemento -> valor)
+            page: Página autenticada a usar
+            username: identification_id, para verificar el resultado si no hay respuesta a tiempo
+
+        Returns:
+            True si el servidor redirigió a la página de roles (usuario creado),
+            False si no, o None si no hubo respuesta a tiempo pero el usuario
+            ya figura en el listado (creado, sin rol asignado)
+        """
+        # 1. Navegar al formulario; si la página ya está en él (p. ej. tras un
+        # envío rechazado), basta con limpiarlo
+        if page.url != self.form_url or not await page.evaluate(_FORM_RESET_JS):
+            await self._goto(page, self.form_url)
+            await page.wait_for_load_state("networkidle")
+            await page.wait_for_selector("#form", timeout=5000)
+
+        # 2. Llenar formulario (todos los campos en un solo round-trip)
+        await self._bulk_fill(page, fields)
+
+        # 3. Hacer scroll y enviar
+        logger.info("📤 Enviando formulario...")
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+
+        # 4. Enviar y esperar la respuesta del POST: el servidor redirige
+        # (3xx) si creó el usuario y re-renderiza el formulario (200) con
+        # errores si no. Se espera el evento de respuesta, sin sondear la URL.
+        try:
+            async with page.expect_response(
+                lambda r: r.request.method == "POST" and r.request.is_navigation_request(),
+                timeout=15000
+            ) as response_info:
+                await page.evaluate("document.getElementById('enviar').click()")
+            response = await response_info.value
+            location = response.headers.get("location")
+            return 300 <= response.status < 400 and bool(location) and self._is_created_redirect(location)
+        except PlaywrightTimeoutError:
+            # Sin respuesta no se puede asumir que falló: el servidor pudo crear
+            # el usuario, y reintentarlo lo enviaría dos veces
+            logger.warning(f"⚠️  Sin respuesta al crear {username}, verificando si se creó...")
+            if page.url != self.form_url and self._is_created_redirect(page.url):
+                return True
+            if username in await self._fetch_existing_ids([username]):
+                return None
+            return False
+
+    async def _fetch_existing_ids(self, usernames: list[str]) -> set[str]:
+        """
+        Consulta el listado de usuarios y retorna los del lote que ya existen.
+
+        Usa la sesión de la página principal (page.request comparte cookies),
+        lee solo la columna de identificación de la tabla (cualquier otro número
+        de la página, como tokens o paginación, se ignora) y sigue los enlaces
+        de página siguiente. Si el listado no se puede leer completo, no se
+        hace pre-chequeo: el formulario igual detecta los usuarios existentes.
+
+        Args:
+            usernames: identification_id de los usuarios del lote
+
+        Returns:
+            Subconjunto de usernames presentes en AppConnecto
+            (vacío si no hay URL configurada o el listado no se pudo leer)
+        """
+        if not self.users_list_url or not usernames:
+            return set()
+
+        wanted = set(usernames)
+        found: set[str] = set()
+        column = self.users_list_id_column.strip().lower()
+        column_index: int | None = None
+        url: str | None = self.users_list_url
+        visited: set[str] = set()
+
+        while url:
+            if url in visited or len(visited) >= _MAX_LIST_PAGES:
+                logger.warning("⚠️  Paginación del listado de usuarios inconsistente, se omite el pre-chequeo")
+                return set()
+            visited.add(url)
+
+            try:
+                response = await self.page.request.get(url)
+                if not response.ok:
+                    logger.warning(f"⚠️  Listado de usuarios respondió {response.status}, se omite el pre-chequeo")
+                    return set()
+                content = await response.text()
+            except Exception as e:
+                logger.warning(f"⚠️  No se pudo consultar el listado de usuarios: {e}")
+                return set()
+
+            parser = _UsersTableParser()
+            parser.feed(content)
+
+            if column_index is None:
+                headers = next(
+                    (row for row in parser.header_rows if column in (cell.lower() for cell in row)),
+                    None
+                )
+                if headers is None:
+                    logger.warning(
+                        f"⚠️  Columna '{self.users_list_id_column}' no encontrada en el listado, "
+                        "se omite el pre-chequeo"
+                    )
+                    return set()
+                column_index = [cell.lower() for cell in headers].index(column)
+
+            found.update(
+                row[column_index] for row in parser.rows
+                if len(row) > column_index and row[column_index] in wanted
+            )
+            url = urljoin(url, parser.next_href) if parser.next_href else None
+
+        return found
+
     async def create_users(self, users: list[dict]) -> dict:
         """
         Crea múltiples usuarios en AppConnecto.
@@ -365,6 +974,9 @@ class AppConnectoClient:
                 - errors: Lista de dicts con username y error
                 - total: Total de usuarios procesados
 
+        Los usuarios se reparten entre `self.workers` contextos del mismo navegador,
+        cada uno con su propia sesión, y se procesan en paralelo.
+
         Example:
             >>> client = AppConnectoClient()
             >>> await client.login()
@@ -374,35 +986,67 @@ class AppConnectoClient:
         created = []
         already_exists = []
         errors = []
+        total = len(users)
+        normalized = self._normalize_users(users)
+
+        logger.info(f"📋 Iniciando creación de {total} usuarios en AppConnecto")
+
+        # Los que ya aparecen en el listado no pasan por el formulario
+        existing_ids = await self._fetch_existing_ids([user[0] for user in normalized])
+        if existing_ids:
+            logger.info(f"⚠️  {len(existing_ids)} usuarios ya existen en AppConnecto, se omiten")
+            already_exists.extend(user[0] for user in normalized if user[0] in existing_ids)
+            normalized = [user for user in normalized if user[0] not in existing_ids]
+        pending = len(normalized)
+
+        # Pool de páginas autenticadas: la principal más (workers - 1) contextos nuevos.
+        # Cada usuario toma una página libre, así que la cola limita la concurrencia.
+        pool: asyncio.Queue[Page] = asyncio.Queue()
+        pool.put_nowait(self.page)
+
+        extra_workers = min(self.workers, pending) - 1
+        if extra_workers > 0:
+            extra_pages = await asyncio.gather(
+                *(self._new_worker_context() for _ in range(extra_workers)),
+                return_exceptions=True
+            )
+            for extra_page in extra_pages:
+                if isinstance(extra_page, Exception):
+                    logger.warning(f"⚠️  No se pudo crear worker adicional: {extra_page}")
+                elif extra_page:
+                    pool.put_nowait(extra_page)
 
-        logger.info(f"📋 Iniciando creación de {len(users)} usuarios en AppConnecto")
-
-        for i, user_data in enumerate(users, 1):
-            logger.info(f"[{i}/{len(users)}]")
+        logger.info(f"   Workers en paralelo: {pool.qsize()}")
 
+        async def create_with_pool(i: int, username: str, fields: dict[str, str], rol: str) -> dict:
+            page = await pool.get()
             try:
-                result = await self.create_user(user_data)
-
-                if result["status"] == "created":
-                    created.append(result["username"])
-                elif result["status"] == "already_exists":
-                    already_exists.append(result["username"])
-                else:
-                    errors.append({
-                        "username": result["username"],
-                        "error": result.get("error", "Error desconocido")
-                    })
+                logger.info(f"[{i}/{pending}]")
+                return await self._create_user(username, fields, rol, page)
+            finally:
+                pool.put_nowait(page)
+
+        outcomes = await asyncio.gather(
+            *(create_with_pool(i, *user) for i, user in enumerate(normalized, 1)),
+            return_exceptions=True
+        )
 
-            except Exception as e:
-                username = user_data.get("identification_id", "unknown")
-                logger.error(f"❌ Error crítico con usuario {username}: {e}")
+        for (username, _, _), result in zip(normalized, outcomes):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Error crítico con usuario {username}: {result}")
                 errors.append({
                     "username": username,
-                    "error": str(e)
+                    "error": str(result)
+                })
+            elif result["status"] == "created":
+                created.append(result["username"])
+            elif result["status"] == "already_exists":
+                already_exists.append(result["username"])
+            else:
+                errors.append({
+                    "username": result["username"],
+                    "error": result.get("error", "Error desconocido")
                 })
-
-            # Pausa entre usuarios
-            await asyncio.sleep(2)
 
         return {
             "created": created,
@@ -413,7 +1057,10 @@ class AppConnectoClient:
 
     async def close(self) -> None:
         """
-        Cierra el navegador y libera recursos.
+        Cierra los contextos del cliente y libera recursos.
+
+        El navegador compartido sigue abierto para los siguientes clientes;
+        se cierra con shutdown_browser() al terminar el proceso.
 
         Example:
             >>> client = AppConnectoClient()
@@ -421,26 +1068,27 @@ class AppConnectoClient:
             >>> # ... hacer operaciones ...
             >>> await client.close()
         """
-        logger.info("🔒 Cerrando navegador...")
+        logger.info("🔒 Cerrando contextos del navegador...")
 
-        if self.context:
-            await self.context.close()
-        if self.browser:
-            await self.browser.close()
-        if self.playwright:
-            await self.playwright.stop()
+        # Esperar capturas pendientes antes de cerrar sus páginas
+        if self._screenshot_tasks:
+            await asyncio.gather(*self._screenshot_tasks, return_exceptions=True)
+
+        # Los contextos son independientes entre sí: se cierran en paralelo
+        contexts = [*self._contexts, self.context] if self.context else self._contexts
+        await asyncio.gather(*(context.close() for context in contexts), return_exceptions=True)
+        self._contexts.clear()
 
         self.page = None
         self.context = None
         self.browser = None
-        self.playwright = None
 
-        logger.info("✅ Navegador cerrado")
+        logger.info("✅ Contextos cerrados")
 
 
 async def create_users_in_appconnecto(
     users: list[dict],
-    headless: bool = False,
+    headless: bool = True,
     debug_screenshots: bool = False
 ) -> dict:
     """
@@ -454,6 +1102,9 @@ async def create_users_in_appconnecto(
     Returns:
         Diccionario con resultados de creación
 
+    El navegador queda abierto para llamadas posteriores; llamar a
+    shutdown_browser() al terminar el proceso.
+
     Example:
         >>> results = await create_users_in_appconnecto(users_list)
         >>> print(f"Creados: {len(results['created'])}")
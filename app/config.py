@@ -16,10 +16,20 @@ class Settings(BaseSettings):
     appconnecto_form_url: str
     appconnecto_default_password: str
     appconnecto_default_birth_date: str = "1990-01-01"
+    appconnecto_workers: int = 4  # Contextos de navegador en paralelo
+    appconnecto_state_file: str = ".appconnecto_state.json"  # Sesión guardada (cookies)
+    appconnecto_state_max_age_hours: float = 6  # Antigüedad máxima para reutilizarla
+    appconnecto_direct_post: bool = True  # Crear usuarios con POST directo (fallback: formulario)
+    appconnecto_users_list_url: str = ""  # Listado de usuarios para pre-chequeo (vacío = desactivado)
+    appconnecto_users_list_id_column: str = "Usuario"  # Encabezado de la columna con el identification_id
 
     # Email
     email_sender_address: str
     email_subject_welcome: str = "Bienvenido a la ECR - Credenciales de acceso"
+    graph_send_concurrency: int = 2  # Lotes de correos ($batch, 20 c/u) enviados en paralelo vía Graph
+    graph_create_concurrency: int = 8  # Usuarios creados en paralelo en Office 365
+    graph_group_cache_file: str = ".graph_groups_cache.json"  # IDs de grupos resueltos
+    graph_group_cache_ttl_hours: float = 24  # Antigüedad máxima para reutilizarlos
 
     # Database
     database_url: str = ""
@@ -27,6 +37,8 @@ class Settings(BaseSettings):
     # General
     debug: bool = False
     log_level: str = "INFO"
+    screenshots_enabled: bool = False  # Capturas de error en AppConnecto
+    report_json_pretty: bool = False  # JSON de logs/ indentado (por defecto compacto)
 
     # Valores permitidos para validación de usuarios
     allowed_request_types: list[str] = ["Apertura", "Activación"]
@@ -5,9 +5,57 @@ Este módulo genera emails institucionales para estudiantes,
 garantizando unicidad y aplicando reglas de normalización.
 """
 
+import re
 import unicodedata
+from functools import lru_cache
 from loguru import logger
 
+# Equivalentes en regex de isalnum() para el camino general (\w en str es
+# isalnum() más '_')
+_NON_ALNUM_RE = re.compile(r'[\W_]+')
+_NON_ALNUM_KEEP_SPACES_RE = re.compile(r'[^\w ]+|_+')
+
+
+@lru_cache(maxsize=None)
+def _translate_tables() -> tuple[dict[int, str | None], ...]:
+    """
+    Construye (una sola vez, en el primer uso) las tablas de str.translate
+    para todo el plano básico de Unicode.
+
+    Cada carácter se mapea a su minúscula descompuesta (NFD) sin marcas
+    diacríticas, de modo que la normalización completa se hace en pasadas
+    en C sobre el texto. Solo se guardan los caracteres que cambian.
+
+    Returns:
+        Tupla (fold, keep_alnum_spaces, fold_alnum):
+            - fold: minúscula + NFD + sin marcas (Mn)
+            - keep_alnum_spaces: elimina lo que no sea alfanumérico o espacio
+            - fold_alnum: fold y además elimina todo lo no alfanumérico
+    """
+    fold = {}
+    keep_alnum_spaces = {}
+    fold_alnum = {}
+
+    for cp in range(0x10000):
+        char = chr(cp)
+        # NFD separa también ñ → n + ˜ y ü → u + ¨: al quitar las marcas (Mn)
+        # quedan n y u, así que no hace falta reemplazarlos a mano
+        folded = ''.join(
+            c for c in unicodedata.normalize('NFD', char.lower())
+            if unicodedata.category(c) != 'Mn'
+        )
+        if folded != char:
+            fold[cp] = folded or None
+
+        if not (char.isalnum() or char == ' '):
+            keep_alnum_spaces[cp] = None
+
+        folded_alnum = ''.join(c for c in folded if c.isalnum())
+        if folded_alnum != char:
+            fold_alnum[cp] = folded_alnum or None
+
+    return fold, keep_alnum_spaces, fold_alnum
+
 
 class EmailGenerator:
     """
@@ -21,6 +69,7 @@ class EmailGenerator:
         domain: Dominio del email institucional
         _existing_emails: Set de emails existentes en Office 365
         _generated_in_batch: Set de emails generados en el batch actual
+        _taken: Unión de los dos anteriores (un solo lookup por candidato)
     """
 
     def __init__(self, domain: str = "ecr.edu.co"):
@@ -30,10 +79,11 @@ class EmailGenerator:
         Args:
             domain: Dominio para los emails generados
         """
-        self.domain = domain
+        self.domain = domain.lower()  # Los candidatos quedan siempre en minúsculas
         self._existing_emails: set[str] = set()
         self._generated_in_batch: set[str] = set()
-        self._existing_users: dict[str, str] = {}  # nombre_normalizado -> email
+        self._taken: set[str] = set()
+        self._existing_users: dict[tuple[str, ...], str] = {}  # palabras del nombre ordenadas -> email
 
     def load_existing_emails(self, emails: set[str]) -> None:
         """
@@ -43,6 +93,7 @@ class EmailGenerator:
             emails: Set de emails existentes (obtenidos de Graph API)
         """
         self._existing_emails = {e.lower() for e in emails}
+        self._taken = self._existing_emails | self._generated_in_batch
         logger.info(f"Cargados {len(self._existing_emails)} emails existentes")
 
     def load_existing_users(self, users_info: list[dict]) -> None:
@@ -56,17 +107,18 @@ class EmailGenerator:
             users_info: Lista de dicts con email y display_name
                        [{"email": "...", "display_name": "..."}, ...]
         """
-        for user in users_info:
-            email = user.get('email', '').lower()
-            display_name = user.get('display_name', '')
-
-            if email and display_name:
-                # Normalizar nombre para comparación
-                normalized_name = self._normalize_name_for_comparison_from_display(display_name)
-                self._existing_users[normalized_name] = email
-
-                # También agregar a existing_emails
-                self._existing_emails.add(email)
+        # Pares (nombre normalizado, email) de los usuarios con ambos datos
+        pairs = [
+            (self._normalize_name_for_comparison_from_display(user['display_name']), user['email'].lower())
+            for user in users_info
+            if user.get('email') and user.get('display_name')
+        ]
+        self._existing_users.update(pairs)
+
+        # También agregar a existing_emails
+        emails = [email for _, email in pairs]
+        self._existing_emails.update(emails)
+        self._taken.update(emails)
 
         logger.info(f"Cargados {len(self._existing_users)} usuarios existentes con nombres")
 
@@ -86,8 +138,11 @@ class EmailGenerator:
             'laura.becerra@ecr.edu.co'  # Si existe
             None  # Si no existe
         """
-        normalized_name = self._normalize_name_for_comparison(full_name, full_last_name)
-        existing_email = self._existing_users.get(normalized_name)
+        # Sin usuarios cargados no hay con qué comparar: se omite la normalización
+        existing_email = None
+        if self._existing_users:
+            normalized_name = self._normalize_name_for_comparison(full_name, full_last_name)
+            existing_email = self._existing_users.get(normalized_name)
 
         if existing_email:
             logger.warning(
@@ -119,8 +174,6 @@ class EmailGenerator:
             >>> generator.generate_email("Laura", "Becerra", "Sandoval")
             'laura.becerra@ecr.edu.co'
         """
-        logger.debug(f"Generando email para: {first_name} {first_last_name} {second_last_name}")
-
         # Normalizar componentes
         name_normalized = self._normalize_for_email(first_name)
         last_name_normalized = self._normalize_for_email(first_last_name)
@@ -128,46 +181,40 @@ class EmailGenerator:
 
         # Email base: nombre.apellido
         base_email = f"{name_normalized}.{last_name_normalized}"
-        email = f"{base_email}@{self.domain}"
 
-        # Si está disponible, retornar
-        if self._is_available(email):
-            self._generated_in_batch.add(email)
-            logger.info(f"Email generado: {email}")
+        # Referencia local al set de ocupados: todos los sondeos de esta
+        # llamada la comparten sin pasar por atributos de instancia
+        taken = self._taken
+
+        # Candidatos en orden de preferencia: el base y luego con 1..N letras
+        # del segundo apellido; se toma el primero disponible
+        candidates = [
+            f"{base_email}{second_last_normalized[:i]}@{self.domain}"
+            for i in range(len(second_last_normalized) + 1)
+        ]
+        email = next((c for c in candidates if c not in taken), None)
+
+        if email:
+            self._mark_generated(email)
+            if email == candidates[0]:
+                logger.info(f"Email generado: {email}")
+            else:
+                logger.warning(f"Email {candidates[0]} ya existe, generado con segundo apellido: {email}")
             return email
 
-        # Si no está disponible, intentar con letras del segundo apellido
-        if second_last_normalized:
-            logger.warning(f"Email {email} ya existe, agregando letras del segundo apellido...")
-
-            for i in range(1, len(second_last_normalized) + 1):
-                suffix = second_last_normalized[:i]
-                candidate = f"{base_email}{suffix}@{self.domain}"
-
-                if self._is_available(candidate):
-                    self._generated_in_batch.add(candidate)
-                    logger.info(f"Email generado: {candidate}")
-                    return candidate
-
         # Si se agotó el segundo apellido (o no existe), usar números
-        logger.warning(f"Segundo apellido agotado para {base_email}, agregando números...")
-
-        counter = 1
-        while True:
+        for counter in range(1, 10000):
             candidate = f"{base_email}{counter}@{self.domain}"
 
-            if self._is_available(candidate):
-                self._generated_in_batch.add(candidate)
-                logger.info(f"Email generado: {candidate}")
+            if candidate not in taken:
+                self._mark_generated(candidate)
+                logger.warning(f"Segundo apellido agotado para {base_email}, generado con número: {candidate}")
                 return candidate
 
-            counter += 1
+        # Límite de seguridad (evitar loop infinito)
+        raise Exception(f"No se pudo generar email único para {first_name} {first_last_name}")
 
-            # Límite de seguridad (evitar loop infinito)
-            if counter > 9999:
-                raise Exception(f"No se pudo generar email único para {first_name} {first_last_name}")
-
-    def _normalize_name_for_comparison(self, full_name: str, full_last_name: str) -> str:
+    def _normalize_name_for_comparison(self, full_name: str, full_last_name: str) -> tuple[str, ...]:
         """
         Normaliza nombre completo para comparación.
 
@@ -179,11 +226,11 @@ class EmailGenerator:
             full_last_name: Apellidos completos
 
         Returns:
-            Nombre normalizado y ordenado
+            Palabras del nombre normalizadas y ordenadas (clave de _existing_users)
 
         Example:
             >>> _normalize_name_for_comparison("Laura Sofia", "Becerra Sandoval")
-            'becerra laura sandoval sofia'
+            ('becerra', 'laura', 'sandoval', 'sofia')
         """
         # Combinar nombres y apellidos
         combined = f"{full_name} {full_last_name}"
@@ -197,10 +244,10 @@ class EmailGenerator:
         # Ordenar alfabéticamente para comparación flexible
         words_sorted = sorted(words)
 
-        # Unir con espacios
-        return ' '.join(words_sorted)
+        # La tupla sirve directamente como clave, sin unir en un string
+        return tuple(words_sorted)
 
-    def _normalize_name_for_comparison_from_display(self, display_name: str) -> str:
+    def _normalize_name_for_comparison_from_display(self, display_name: str) -> tuple[str, ...]:
         """
         Normaliza displayName de Office 365 para comparación.
 
@@ -208,11 +255,11 @@ class EmailGenerator:
             display_name: Nombre completo desde Office 365
 
         Returns:
-            Nombre normalizado y ordenado
+            Palabras del nombre normalizadas y ordenadas (clave de _existing_users)
 
         Example:
             >>> _normalize_name_for_comparison_from_display("Laura Sofia Becerra Sandoval")
-            'becerra laura sandoval sofia'
+            ('becerra', 'laura', 'sandoval', 'sofia')
         """
         # Normalizar: minúsculas, sin tildes, preservando espacios
         normalized = self._normalize_for_email(display_name, preserve_spaces=True)
@@ -223,16 +270,22 @@ class EmailGenerator:
         # Ordenar alfabéticamente
         words_sorted = sorted(words)
 
-        # Unir con espacios
-        return ' '.join(words_sorted)
+        # La tupla sirve directamente como clave, sin unir en un string
+        return tuple(words_sorted)
 
-    def _normalize_for_email(self, text: str, preserve_spaces: bool = False) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _normalize_for_email(text: str, preserve_spaces: bool = False) -> str:
         """
         Normaliza texto para uso en email.
 
+        Es una función pura con caché: en un lote los nombres y apellidos se
+        repiten mucho y cada valor se normaliza una sola vez. La normalización
+        usa tablas precalculadas de str.translate (ver _translate_tables).
+
         Aplica:
         - Minúsculas
-        - Elimina tildes (á→a, é→e, í→i, ó→o, ú→u, ñ→n)
+        - Elimina tildes (á→a, é→e, í→i, ó→o, ú→u, ñ→n, ü→u)
         - Elimina espacios (opcional)
 
         Args:
@@ -251,57 +304,62 @@ class EmailGenerator:
         if not text:
             return ""
 
-        # Convertir a minúsculas
-        text = text.lower()
+        # Caracteres fuera del plano básico (no están en las tablas) o Σ (su
+        # minúscula depende del contexto): normalización general
+        if not text.isascii() and (max(text) > '\uffff' or 'Σ' in text):
+            return EmailGenerator._normalize_for_email_general(text, preserve_spaces)
 
-        # Eliminar tildes usando NFD (Canonical Decomposition)
-        # NFD separa caracteres compuestos: á → a + ´
-        text = unicodedata.normalize('NFD', text)
+        fold, keep_alnum_spaces, fold_alnum = _translate_tables()
 
-        # Filtrar solo caracteres ASCII (elimina acentos y diacríticos)
-        text = ''.join(char for char in text if unicodedata.category(char) != 'Mn')
+        if preserve_spaces:
+            # Normalizar espacios múltiples a uno solo y luego eliminar
+            # caracteres no alfanuméricos excepto espacios
+            text = ' '.join(text.translate(fold).split())
+            return text.translate(keep_alnum_spaces)
+
+        # Minúsculas, sin tildes, sin espacios ni caracteres no alfanuméricos
+        return text.translate(fold_alnum)
+
+    @staticmethod
+    def _normalize_for_email_general(text: str, preserve_spaces: bool) -> str:
+        """
+        Normalización carácter a carácter, válida para cualquier texto.
+
+        Produce el mismo resultado que las tablas de _normalize_for_email; se
+        usa solo cuando el texto tiene caracteres que las tablas no cubren.
+
+        Args:
+            text: Texto a normalizar
+            preserve_spaces: Si True, preserva espacios
 
-        # Normalizar caracteres especiales manualmente
-        replacements = {
-            'ñ': 'n',
-            'ü': 'u',
-        }
+        Returns:
+            Texto normalizado para email
+        """
+        # Minúsculas y NFD: separa caracteres compuestos (á → a + ´, ñ → n + ˜,
+        # ü → u + ¨), así que no hace falta reemplazar ñ/ü a mano
+        text = unicodedata.normalize('NFD', text.lower())
 
-        for old, new in replacements.items():
-            text = text.replace(old, new)
+        # Eliminar acentos y diacríticos
+        text = ''.join(char for char in text if unicodedata.category(char) != 'Mn')
 
         if preserve_spaces:
             # Normalizar espacios múltiples a uno solo
             text = ' '.join(text.split())
             # Eliminar caracteres no alfanuméricos excepto espacios
-            text = ''.join(char for char in text if char.isalnum() or char == ' ')
-        else:
-            # Eliminar espacios
-            text = text.replace(' ', '')
-            # Eliminar caracteres no alfanuméricos
-            text = ''.join(char for char in text if char.isalnum())
+            return _NON_ALNUM_KEEP_SPACES_RE.sub('', text)
 
-        return text
+        # Eliminar espacios y caracteres no alfanuméricos
+        return _NON_ALNUM_RE.sub('', text)
 
-    def _is_available(self, email: str) -> bool:
+    def _mark_generated(self, email: str) -> None:
         """
-        Verifica si un email está disponible.
-
-        Un email está disponible si:
-        - No existe en Office 365 (_existing_emails)
-        - No ha sido generado en el batch actual (_generated_in_batch)
+        Registra un email generado en el batch y lo marca como ocupado.
 
         Args:
-            email: Email a verificar
-
-        Returns:
-            True si está disponible, False en caso contrario
+            email: Email generado (en minúsculas)
         """
-        email_lower = email.lower()
-        return (
-            email_lower not in self._existing_emails and
-            email_lower not in self._generated_in_batch
-        )
+        self._generated_in_batch.add(email)
+        self._taken.add(email)
 
     def reset_batch(self) -> None:
         """
@@ -310,4 +368,5 @@ class EmailGenerator:
         Útil si se procesan múltiples archivos Excel secuencialmente.
         """
         self._generated_in_batch.clear()
+        self._taken = set(self._existing_emails)
         logger.debug("Batch de emails generados reiniciado")
@@ -4,11 +4,12 @@ Módulo para enviar correos de bienvenida con credenciales.
 Usa Jinja2 para renderizar templates HTML y Microsoft Graph API para enviar correos.
 """
 
+import asyncio
 from jinja2 import Environment, FileSystemLoader
 from pathlib import Path
 from loguru import logger
 from app.config import get_settings
-from app.graph_api import GraphAPIClient
+from app.graph_api import BATCH_SIZE, GraphAPIClient
 
 settings = get_settings()
 
@@ -29,7 +30,10 @@ class EmailSender:
         """
         self.graph_client = graph_client
         self.template_dir = Path(__file__).parent.parent / "templates"
-        self.env = Environment(loader=FileSystemLoader(self.template_dir))
+        # Sin auto_reload: el template no cambia durante la ejecución
+        self.env = Environment(loader=FileSystemLoader(self.template_dir), auto_reload=False)
+        self._welcome_template = self.env.get_template("welcome_email.html")
+        self._appconnecto_password = settings.appconnecto_default_password
 
     def render_welcome_email(self, user_data: dict) -> str:
         """
@@ -56,13 +60,12 @@ class EmailSender:
             ...     "identification_id": "1234567890"
             ... })
         """
-        template = self.env.get_template("welcome_email.html")
-        return template.render(
+        return self._welcome_template.render(
             nombre=f"{user_data['full_name']} {user_data['full_last_name']}",
             email_institucional=user_data['institutional_email'],
             password_office365=user_data.get('password_generated', 'No disponible'),
             identification_id=user_data['identification_id'],
-            password_appconnecto=settings.appconnecto_default_password
+            password_appconnecto=self._appconnecto_password
         )
 
     async def send_welcome_email(self, user_data: dict) -> dict:
@@ -127,21 +130,60 @@ class EmailSender:
         """
         sent = []
         failed = []
-
-        logger.info(f"📧 Enviando {len(users)} correos de bienvenida...")
-
-        for i, user in enumerate(users, 1):
-            logger.info(f"[{i}/{len(users)}] Enviando a: {user.get('email_personal')}")
-
-            result = await self.send_welcome_email(user)
-
-            if result["status"] == "sent":
-                sent.append({"email": result["email"], "name": result["name"]})
+        total = len(users)
+
+        logger.info(f"📧 Enviando {total} correos de bienvenida...")
+
+        # Renderizar todos los correos antes de enviar (trabajo local)
+        recipients = []  # (email, nombre) de los correos listos para enviar
+        messages = []
+        for user in users:
+            email_personal = user.get('email_personal')
+            full_name = f"{user['full_name']} {user['full_last_name']}"
+            try:
+                html = self.render_welcome_email(user)
+            except Exception as e:
+                logger.error(f"❌ Error enviando correo a {full_name} ({email_personal}): {e}")
+                failed.append({"email": email_personal, "name": full_name, "error": str(e)})
+                continue
+            recipients.append((email_personal, full_name))
+            messages.append({
+                "to_email": email_personal,
+                "subject": settings.email_subject_welcome,
+                "body_html": html
+            })
+
+        # Envío por /$batch (BATCH_SIZE correos por request), con un tope de
+        # lotes en vuelo; un error en un lote solo afecta a sus correos
+        semaphore = asyncio.Semaphore(max(1, settings.graph_send_concurrency))
+
+        async def send_chunk(chunk: list[dict]) -> list[dict]:
+            async with semaphore:
+                try:
+                    return await self.graph_client.bulk_send_emails(chunk)
+                except Exception as e:
+                    return [{"success": False, "error": str(e)}] * len(chunk)
+
+        chunk_results = await asyncio.gather(*(
+            send_chunk(messages[start:start + BATCH_SIZE])
+            for start in range(0, len(messages), BATCH_SIZE)
+        ))
+
+        results = [result for chunk in chunk_results for result in chunk]
+        for (email_personal, full_name), result in zip(recipients, results):
+            if result["success"]:
+                logger.info(f"✅ Correo enviado a: {full_name} ({email_personal})")
+                sent.append({"email": email_personal, "name": full_name})
             else:
-                failed.append({"email": result["email"], "name": result["name"], "error": result.get("error")})
+                logger.error(f"❌ Error enviando correo a: {full_name} ({email_personal})")
+                failed.append({
+                    "email": email_personal,
+                    "name": full_name,
+                    "error": result.get("error", "Error desconocido")
+                })
 
         return {
             "sent": sent,
             "failed": failed,
-            "total": len(users)
+            "total": total
         }
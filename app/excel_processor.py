@@ -6,11 +6,23 @@ desde archivos Excel usando el schema UserSchema.
 """
 
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from loguru import logger
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 from app.schemas import UserSchema
 
+# Valida el lote completo en una sola llamada al validador de pydantic-core
+_USER_LIST_ADAPTER = TypeAdapter(list[UserSchema])
+
+# calamine (python-calamine, en Rust) lee .xlsx/.xls varias veces más rápido
+# que openpyxl; si no está instalado se usa openpyxl
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+
 
 class ExcelProcessorError(Exception):
     """Error al procesar archivo Excel."""
@@ -120,9 +132,13 @@ class ExcelProcessor:
             df = pd.read_excel(
                 file_path,
                 skiprows=self.skip_rows,
-                engine='openpyxl'
+                engine=EXCEL_ENGINE,
+                # Solo las columnas mapeadas; las faltantes las reporta _validate_columns
+                usecols=lambda col: col in self.COLUMN_MAPPING,
+                # El ID como texto desde el origen (sin pasar por float)
+                dtype={"Número de Identificación": str}
             )
-            logger.info(f"Excel leído: {len(df)} filas encontradas")
+            logger.info(f"Excel leído: {len(df)} filas encontradas ({EXCEL_ENGINE})")
             return df
         except Exception as e:
             raise ExcelProcessorError(f"Error al leer Excel: {str(e)}")
@@ -161,49 +177,51 @@ class ExcelProcessor:
         # Eliminar filas completamente vacías
         df = df.dropna(how='all')
 
-        # Limpiar espacios en strings
-        for col in df.select_dtypes(include=['object']).columns:
-            df[col] = df[col].astype(str).str.strip()
+        # Limpiar espacios en strings (solo celdas con valor; las vacías
+        # quedan como '' sin pasar por el string 'nan')
+        obj_cols = df.select_dtypes(include=['object']).columns
+        df[obj_cols] = (
+            df[obj_cols]
+            .apply(lambda s: s.dropna().astype(str).str.strip())
+            .reindex(df.index)
+            .fillna('')
+        )
 
         # Convertir IDs float a string (1234567890.0 → "1234567890")
         id_col = "Número de Identificación"
         if id_col in df.columns:
-            df[id_col] = df[id_col].apply(self._clean_id)
+            df[id_col] = self._clean_ids(df[id_col])
 
         # Eliminar filas donde campos críticos estén vacíos
         critical_fields = ["Nombre", "Apellido", "Número de Identificación", "Correo Electrónico Personal"]
         df = df.dropna(subset=critical_fields)
 
-        # Reemplazar valores 'nan' string por vacío
-        df = df.replace('nan', '')
-
         logger.info(f"Datos limpios: {len(df)} filas válidas")
         return df
 
-    def _clean_id(self, value) -> str:
+    def _clean_ids(self, ids: pd.Series) -> pd.Series:
         """
-        Limpia el número de identificación.
+        Limpia la columna de números de identificación de forma vectorizada.
+
+        Vacíos → "", decimales (1234567890.0 → "1234567890") truncados y el
+        resto (p. ej. IDs con ceros a la izquierda) se conserva como texto.
 
         Args:
-            value: Valor del ID (puede ser float, int o string)
+            ids: Columna de IDs (float, int o string)
 
         Returns:
-            ID como string sin decimales
+            Columna de IDs como strings sin decimales
         """
-        if pd.isna(value):
-            return ""
+        text = ids.astype(str).str.strip().where(ids.notna(), "")
 
-        # Convertir a string y limpiar
-        str_value = str(value).strip()
+        # Solo los valores con punto se interpretan como número
+        dotted = text.str.contains(".", regex=False)
+        if dotted.any():
+            numeric = pd.to_numeric(text[dotted], errors="coerce")
+            numeric = numeric[np.isfinite(numeric)]
+            text[numeric.index] = np.trunc(numeric).astype("int64").astype(str)
 
-        # Si es float (1234567890.0), quitar decimales
-        if '.' in str_value:
-            try:
-                return str(int(float(str_value)))
-            except ValueError:
-                return str_value
-
-        return str_value
+        return text
 
     def _process_rows(self, df: pd.DataFrame) -> list[dict]:
         """
@@ -218,35 +236,81 @@ class ExcelProcessor:
         Raises:
             ExcelProcessorError: Si hay errores de validación
         """
+        # Mapear columnas Excel → campos schema una sola vez; cada fila
+        # queda como dict listo para el schema
+        records = (
+            df[list(self.COLUMN_MAPPING)]
+            .rename(columns=self.COLUMN_MAPPING)
+            .to_dict('records')
+        )
+
+        row_numbers = [idx + 1 + self.skip_rows for idx in df.index]  # Número de fila en Excel
+
+        try:
+            validated = _USER_LIST_ADAPTER.validate_python(records)
+        except ValidationError as e:
+            # Cada error trae (posición en el lote, campo, ...) en 'loc';
+            # se agrupan por fila para reportar igual que antes
+            error_details: dict[int, list[str]] = {}
+            for error in e.errors():
+                position, *field = error['loc']
+                error_details.setdefault(position, []).append(
+                    f"{'.'.join(map(str, field))}: {error['msg']}"
+                )
+
+            errors = []
+            for position in sorted(error_details):
+                error_msg = f"Fila {row_numbers[position]}: {'; '.join(error_details[position])}"
+                logger.warning(error_msg)
+                errors.append(error_msg)
+
+            self._raise_row_errors(errors)
+        except Exception:
+            # Un error no previsto en un validador no indica la fila: se
+            # valida fila por fila para reportarla, como antes del lote
+            return self._process_rows_individually(records, row_numbers)
+
+        # Extraer nombres para email
         users = []
         errors = []
+        for row_number, user in zip(row_numbers, validated):
+            try:
+                users.append(user.extract_names_for_email().model_dump())
+            except Exception as e:
+                error_msg = f"Fila {row_number}: Error inesperado - {str(e)}"
+                logger.error(error_msg)
+                errors.append(error_msg)
 
-        for idx, row in df.iterrows():
-            row_number = idx + 1 + self.skip_rows  # Número de fila en Excel
+        if errors:
+            self._raise_row_errors(errors)
+        return users
 
-            try:
-                # Mapear columnas Excel → campos schema
-                user_data = {
-                    schema_field: row[excel_col]
-                    for excel_col, schema_field in self.COLUMN_MAPPING.items()
-                }
+    def _process_rows_individually(self, records: list[dict], row_numbers: list[int]) -> list[dict]:
+        """
+        Valida las filas una a una, reportando cada error con su número de fila.
 
-                # Validar con schema
-                user = UserSchema(**user_data)
+        Camino lento, usado solo cuando la validación en lote falla con una
+        excepción que no es ValidationError.
 
-                # Extraer nombres para email
-                user.extract_names_for_email()
+        Args:
+            records: Filas ya mapeadas a campos del schema
+            row_numbers: Número de fila en Excel de cada registro
 
-                # Agregar a lista
+        Returns:
+            Lista de diccionarios con usuarios validados
+
+        Raises:
+            ExcelProcessorError: Si alguna fila tiene errores
+        """
+        users = []
+        errors = []
+        for row_number, record in zip(row_numbers, records):
+            try:
+                user = UserSchema.model_validate(record).extract_names_for_email()
                 users.append(user.model_dump())
 
             except ValidationError as e:
-                error_details = []
-                for error in e.errors():
-                    field = error['loc'][0]
-                    msg = error['msg']
-                    error_details.append(f"{field}: {msg}")
-
+                error_details = [f"{error['loc'][0]}: {error['msg']}" for error in e.errors()]
                 error_msg = f"Fila {row_number}: {'; '.join(error_details)}"
                 logger.warning(error_msg)
                 errors.append(error_msg)
@@ -256,15 +320,18 @@ class ExcelProcessor:
                 logger.error(error_msg)
                 errors.append(error_msg)
 
-        # Si hay errores, lanzar excepción con todos los detalles
         if errors:
-            raise ExcelProcessorError(
-                f"Se encontraron {len(errors)} errores de validación:\n" +
-                "\n".join(errors)
-            )
-
+            self._raise_row_errors(errors)
         return users
 
+    @staticmethod
+    def _raise_row_errors(errors: list[str]) -> None:
+        """Lanza ExcelProcessorError con el detalle de todas las filas con error."""
+        raise ExcelProcessorError(
+            f"Se encontraron {len(errors)} errores de validación:\n" +
+            "\n".join(errors)
+        )
+
 
 def process_excel(file_path: str, skip_rows: int = 0) -> list[dict]:
     """
@@ -1,11 +1,138 @@
+import asyncio
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from urllib.parse import quote
 from msal import ConfidentialClientApplication
 import aiohttp
 from loguru import logger
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from app.config import get_settings
 
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    _json_loads = json.loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 settings = get_settings()
 
+GRAPH_URL = "https://graph.microsoft.com/v1.0"
+PAGE_SIZE = 999  # Máximo $top permitido por Graph para /users
+BATCH_SIZE = 20  # Máximo de sub-requests por llamada a /$batch
+# 429 (throttling) se reintenta siempre: Graph rechaza el request sin procesarlo.
+# 503 y los errores de conexión solo en métodos idempotentes: un POST que crea
+# un usuario pudo aplicarse antes del error y reintentarlo lo duplicaría.
+RETRY_STATUSES = (429, 503)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+_JSON_HEADERS = MappingProxyType({"Content-Type": "application/json"})
+
+# Plantilla del body de POST /users; _build_user_body completa los campos del usuario
+_USER_BODY_TEMPLATE = {
+    "accountEnabled": True,
+    "displayName": None,
+    "mailNickname": None,
+    "userPrincipalName": None,
+    "mail": None,
+    "passwordProfile": None
+}
+
+
+# Caché de grupos compartida por todas las instancias: (tenant_id, nombre) -> group_id
+_GROUP_CACHE: dict[tuple[str, str], str] = {}
+_group_cache_lock = asyncio.Lock()
+
+
+def _load_group_cache() -> None:
+    """Carga la caché de grupos desde disco si existe y no ha expirado."""
+    path = Path(settings.graph_group_cache_file)
+    if _GROUP_CACHE or not path.exists():
+        return
+
+    age_seconds = time.time() - path.stat().st_mtime
+    if age_seconds > settings.graph_group_cache_ttl_hours * 3600:
+        logger.debug("Caché de grupos expirada, se ignorará")
+        return
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        for tenant_id, groups in data.items():
+            for group_name, group_id in groups.items():
+                _GROUP_CACHE[(tenant_id, group_name)] = group_id
+        logger.debug(f"Caché de grupos cargada: {len(_GROUP_CACHE)} grupos")
+    except (OSError, ValueError, AttributeError) as e:
+        logger.warning(f"⚠️ No se pudo leer la caché de grupos: {e}")
+
+
+def _save_group_cache() -> None:
+    """Escribe la caché de grupos a disco (write-through)."""
+    data: dict[str, dict[str, str]] = {}
+    for (tenant_id, group_name), group_id in _GROUP_CACHE.items():
+        data.setdefault(tenant_id, {})[group_name] = group_id
+
+    try:
+        Path(settings.graph_group_cache_file).write_text(
+            json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+    except OSError as e:
+        logger.warning(f"⚠️ No se pudo guardar la caché de grupos: {e}")
+
+
+async def _stream_items(stream: aiohttp.StreamReader, on_item: Callable[[dict], None]) -> dict:
+    """
+    Parsea incrementalmente una respuesta de colección de Graph.
+
+    Cada elemento de "value" se entrega a on_item apenas se completa, sin
+    materializar la página entera en memoria.
+
+    Returns:
+        Metadatos de primer nivel (@odata.count, @odata.nextLink, ...)
+    """
+    meta: dict = {}
+    builder = None
+    async for prefix, event, value in ijson.parse_async(stream):
+        if prefix == 'value.item':
+            if event == 'start_map':
+                builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            if event == 'end_map':
+                on_item(builder.value)
+                builder = None
+        elif builder is not None:
+            builder.event(event, value)
+        elif prefix.startswith('@odata.') and event in ('string', 'number'):
+            meta[prefix] = value
+    return meta
+
+
+@lru_cache(maxsize=1)
+def _build_msal_app() -> ConfidentialClientApplication:
+    """
+    Construye la aplicación MSAL una sola vez por proceso.
+
+    Así su caché de tokens en memoria (y el discovery del tenant) se
+    comparte entre todas las instancias del cliente. La construcción hace
+    requests de red bloqueantes (discovery de la authority), por lo que se
+    invoca desde un hilo en GraphAPIClient.get_token y no en el constructor.
+    """
+    return ConfidentialClientApplication(
+        client_id=settings.azure_client_id,
+        client_credential=settings.azure_client_secret,
+        authority=f"https://login.microsoftonline.com/{settings.azure_tenant_id}"
+    )
+
 
 class GraphAPIClient:
     """Cliente para Microsoft Graph API"""
@@ -18,46 +145,227 @@ class GraphAPIClient:
         self.authority = f"https://login.microsoftonline.com/{self.tenant_id}"
         self.scope = ["https://graph.microsoft.com/.default"]
 
-        self.app = ConfidentialClientApplication(
-            client_id=self.client_id,
-            client_credential=self.client_secret,
-            authority=self.authority
-        )
+        self.app: Optional[ConfidentialClientApplication] = None  # Se construye en get_token
+        _load_group_cache()
 
         self._token: Optional[str] = None
-        self._group_cache: dict[str, str] = {}  # nombre_grupo -> group_id
+        self._token_expiry: float = 0.0  # time.monotonic() a partir del cual se renueva
+        self._token_lock = asyncio.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None  # Conexiones keep-alive compartidas
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Retorna la sesión HTTP compartida, creándola en el primer uso.
+
+        Todas las llamadas reutilizan el pool de conexiones, evitando un
+        handshake TCP + TLS con graph.microsoft.com por request.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=20,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=75
+                ),
+                timeout=aiohttp.ClientTimeout(total=60, connect=10)
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Cierra la sesión HTTP compartida (llamar al terminar el proceso)."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
-    def get_token(self) -> str:
-        """Obtener access token de Azure AD"""
-        result = self.app.acquire_token_for_client(scopes=self.scope)
-        
-        if "access_token" in result:
-            logger.debug("✅ Token obtenido exitosamente")
-            self._token = result["access_token"]
+    async def get_token(self) -> str:
+        """
+        Obtener access token de Azure AD.
+
+        El token se cachea hasta 60s antes de su expiración; el Lock evita
+        que muchas corrutinas concurrentes lo renueven a la vez.
+        """
+        if self._token and time.monotonic() < self._token_expiry:
             return self._token
-        else:
-            error = result.get("error_description", "Unknown error")
-            logger.error(f"❌ Error obteniendo token: {error}")
-            raise Exception(f"Error de autenticación: {error}")
-    
+
+        async with self._token_lock:
+            # Otra corrutina pudo renovarlo mientras esperábamos el lock
+            if self._token and time.monotonic() < self._token_expiry:
+                return self._token
+
+            # Construir la app MSAL (discovery de red) y pedir el token fuera
+            # del event loop
+            result = await asyncio.to_thread(self._acquire_token)
+
+            if "access_token" in result:
+                logger.debug(f"✅ Token obtenido exitosamente (origen: {result.get('token_source', 'desconocido')})")
+                self._token = result["access_token"]
+                self._token_expiry = time.monotonic() + int(result.get("expires_in", 0)) - 60
+                return self._token
+            else:
+                error = result.get("error_description", "Unknown error")
+                logger.error(f"❌ Error obteniendo token: {error}")
+                raise Exception(f"Error de autenticación: {error}")
+
+    def _acquire_token(self) -> dict:
+        """Construye la app MSAL si hace falta y pide el token (bloqueante)."""
+        if self.app is None:
+            self.app = _build_msal_app()
+        return self.app.acquire_token_for_client(scopes=self.scope)
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[dict] = None,
+        json: Optional[dict] = None,
+        params: Optional[dict] = None,
+        on_item: Optional[Callable[[dict], None]] = None,
+        retries: int = 5
+    ) -> tuple[int, Any]:
+        """
+        Ejecuta un request autenticado contra Graph.
+
+        Reintenta con backoff exponencial (respetando Retry-After) las
+        respuestas 429; las 503 y los errores de conexión, solo en métodos
+        idempotentes.
+
+        Args:
+            method: Método HTTP
+            url: URL absoluta de Graph
+            headers: Headers adicionales (Authorization se agrega aquí)
+            json: Body a enviar como JSON
+            params: Parámetros de query
+            on_item: Si se indica, cada elemento de "value" se le entrega a
+                medida que se parsea (ijson) y body son solo los metadatos
+            retries: Reintentos máximos
+
+        Returns:
+            Tupla (status, body): el JSON parseado en respuestas 2xx con
+            contenido JSON, o el texto de la respuesta en cualquier otro caso
+        """
+        token = await self.get_token()
+        base_headers = _JSON_HEADERS if json is not None else {}
+        request_headers = {**base_headers, "Authorization": f"Bearer {token}"}
+        if headers:
+            request_headers.update(headers)
+        # Serializar una sola vez (orjson si está disponible); se reutiliza en reintentos
+        body = _json_dumps(json) if json is not None else None
+
+        session = await self._get_session()
+        streamed = False
+        retry_statuses = RETRY_STATUSES if method in IDEMPOTENT_METHODS else (429,)
+        for attempt in range(retries + 1):
+            try:
+                async with session.request(
+                    method, url, headers=request_headers, data=body, params=params
+                ) as response:
+                    if response.status not in retry_statuses or attempt == retries:
+                        if not (response.ok and response.content_type == "application/json"):
+                            return response.status, await response.text()
+                        if on_item is None:
+                            return response.status, _json_loads(await response.read())
+
+                        # Desde aquí se entregan elementos: un reintento los duplicaría
+                        streamed = True
+                        if ijson is not None:
+                            return response.status, await _stream_items(response.content, on_item)
+                        data = _json_loads(await response.read())
+                        for item in data.pop('value', []):
+                            on_item(item)
+                        return response.status, data
+
+                    try:
+                        delay = max(float(response.headers.get("Retry-After", 2 ** attempt)), 1)
+                    except ValueError:
+                        delay = 2 ** attempt
+                    logger.warning(f"⏳ Graph respondió {response.status}, reintentando en {delay:.0f}s")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if streamed or method not in IDEMPOTENT_METHODS or attempt == retries:
+                    raise
+                delay = 2 ** attempt
+                logger.warning(f"⏳ Error de conexión con Graph ({e!r}), reintentando en {delay}s")
+
+            await asyncio.sleep(delay)
+
     async def list_users(self, limit: int = 10) -> Dict:
         """Listar usuarios de Office 365 (para testing)"""
-        token = self.get_token()
-
-        headers = {"Authorization": f"Bearer {token}"}
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://graph.microsoft.com/v1.0/users?$top={limit}",
-                headers=headers
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
-                else:
-                    error_text = await response.text()
-                    logger.error(f"❌ Error Graph API: {error_text}")
-                    return {"error": error_text}
+        status, data = await self._request("GET", f"{GRAPH_URL}/users?$top={limit}")
+        if status == 200:
+            return data
+        else:
+            logger.error(f"❌ Error Graph API: {data}")
+            return {"error": data}
+
+    async def _fetch_page(
+        self,
+        url: str,
+        on_user: Callable[[dict], None],
+        headers: Optional[dict] = None
+    ) -> Optional[dict]:
+        """
+        GET de una página de Graph, entregando cada usuario a on_user.
+
+        Returns:
+            Metadatos de la página (@odata.nextLink, @odata.count) o None si falló
+        """
+        status, data = await self._request("GET", url, headers=headers, on_item=on_user)
+        if status == 200:
+            return data
+        logger.debug(f"Página de Graph falló (status {status}): {data}")
+        return None
+
+    async def _fetch_all_users(
+        self,
+        select: str,
+        on_user: Callable[[dict], None],
+        domain: Optional[str] = None
+    ) -> None:
+        """
+        Recorre todos los usuarios del tenant con las propiedades indicadas.
+
+        Las páginas se recorren de forma secuencial con @odata.nextLink (Graph
+        no admite $skip en /users). Los usuarios se parsean en streaming y se
+        entregan uno a uno a on_user, así el consumo de memoria no depende del
+        tamaño de cada página.
+
+        Con domain, el filtro por dominio se delega a Graph con endsWith
+        (consulta avanzada); si Graph la rechaza se descargan todos.
+
+        Args:
+            select: Propiedades para $select (ej: "mail,userPrincipalName")
+            on_user: Callback que recibe cada usuario (dict crudo de Graph)
+            domain: Dominio a filtrar en el servidor (opcional)
+
+        Raises:
+            Exception: Si alguna página falla; un listado parcial haría que
+                se generaran emails que ya existen
+        """
+        base_url = f"{GRAPH_URL}/users?$select={select}&$top={PAGE_SIZE}"
+        if domain:
+            suffix = f"@{domain.lower()}"
+            base_url += (
+                f"&$filter=endsWith(mail,'{suffix}')"
+                f" or endsWith(userPrincipalName,'{suffix}')"
+            )
+
+        # endsWith es una consulta avanzada: todas las páginas (también las de
+        # nextLink) deben llevar ConsistencyLevel: eventual junto con $count
+        headers = {"ConsistencyLevel": "eventual"}
+        first = await self._fetch_page(f"{base_url}&$count=true", on_user, headers)
+        if first is None:
+            if domain:
+                logger.debug("Filtro endsWith no soportado, descargando todos los usuarios")
+                return await self._fetch_all_users(select, on_user)
+            raise Exception("Error obteniendo usuarios de Office 365")
+
+        url = first.get('@odata.nextLink')
+        while url:
+            meta = await self._fetch_page(url, on_user, headers)
+            if meta is None:
+                raise Exception("Error obteniendo usuarios de Office 365: listado incompleto")
+            url = meta.get('@odata.nextLink')
 
     async def get_all_user_emails(self, domain: str = "ecr.edu.co") -> set[str]:
         """
@@ -71,32 +379,22 @@ class GraphAPIClient:
         """
         logger.info(f"Obteniendo emails existentes de Office 365 para dominio @{domain}...")
 
-        token = self.get_token()
-        headers = {"Authorization": f"Bearer {token}"}
+        suffix = f"@{domain.lower()}"
 
         emails = set()
-        url = "https://graph.microsoft.com/v1.0/users?$select=mail,userPrincipalName&$top=999"
-
-        async with aiohttp.ClientSession() as session:
-            while url:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        # Extraer emails
-                        for user in data.get('value', []):
-                            # Intentar primero con 'mail', luego con 'userPrincipalName'
-                            email = user.get('mail') or user.get('userPrincipalName')
+        add = emails.add
 
-                            if email and email.lower().endswith(f"@{domain}"):
-                                emails.add(email.lower())
+        def collect(user: dict) -> None:
+            # Intentar primero con 'mail', luego con 'userPrincipalName'.
+            # Se revalida el sufijo: el filtro del servidor acepta también
+            # usuarios con solo el UPN en el dominio, y puede no aplicarse.
+            email = user.get('mail') or user.get('userPrincipalName')
+            if email:
+                email = email.lower()
+                if email.endswith(suffix):
+                    add(email)
 
-                        # Verificar si hay más páginas
-                        url = data.get('@odata.nextLink')
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"❌ Error obteniendo emails: {error_text}")
-                        break
+        await self._fetch_all_users("mail,userPrincipalName", collect, domain)
 
         logger.info(f"Se encontraron {len(emails)} emails existentes en el dominio @{domain}")
         return emails
@@ -122,36 +420,25 @@ class GraphAPIClient:
         """
         logger.info(f"Obteniendo usuarios existentes de Office 365 para dominio @{domain}...")
 
-        token = self.get_token()
-        headers = {"Authorization": f"Bearer {token}"}
+        suffix = f"@{domain.lower()}"
 
         users_info = []
-        url = "https://graph.microsoft.com/v1.0/users?$select=mail,userPrincipalName,displayName&$top=999"
-
-        async with aiohttp.ClientSession() as session:
-            while url:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        # Extraer información de usuarios
-                        for user in data.get('value', []):
-                            # Intentar primero con 'mail', luego con 'userPrincipalName'
-                            email = user.get('mail') or user.get('userPrincipalName')
-                            display_name = user.get('displayName', '')
-
-                            if email and email.lower().endswith(f"@{domain}"):
-                                users_info.append({
-                                    "email": email.lower(),
-                                    "display_name": display_name
-                                })
-
-                        # Verificar si hay más páginas
-                        url = data.get('@odata.nextLink')
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"❌ Error obteniendo usuarios: {error_text}")
-                        break
+        append = users_info.append
+
+        def collect(user: dict) -> None:
+            # Intentar primero con 'mail', luego con 'userPrincipalName'
+            email = user.get('mail') or user.get('userPrincipalName')
+            if not email:
+                return
+
+            email = email.lower()
+            if email.endswith(suffix):
+                append({
+                    "email": email,
+                    "display_name": user.get('displayName', '')
+                })
+
+        await self._fetch_all_users("mail,userPrincipalName,displayName", collect, domain)
 
         logger.info(f"Se encontraron {len(users_info)} usuarios en el dominio @{domain}")
         return users_info
@@ -166,30 +453,39 @@ class GraphAPIClient:
         Returns:
             True si el email existe, False en caso contrario
         """
-        token = self.get_token()
-        headers = {"Authorization": f"Bearer {token}"}
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"https://graph.microsoft.com/v1.0/users/{email}",
-                headers=headers
-            ) as response:
-                if response.status == 200:
-                    logger.debug(f"Email {email} existe en Office 365")
-                    return True
-                elif response.status == 404:
-                    logger.debug(f"Email {email} no existe en Office 365")
-                    return False
-                else:
-                    error_text = await response.text()
-                    logger.warning(f"Error verificando email {email}: {error_text}")
-                    return False
+        status, data = await self._request("GET", f"{GRAPH_URL}/users/{email}")
+        if status == 200:
+            logger.debug(f"Email {email} existe en Office 365")
+            return True
+        elif status == 404:
+            logger.debug(f"Email {email} no existe en Office 365")
+            return False
+        else:
+            logger.warning(f"Error verificando email {email}: {data}")
+            return False
+
+    async def user_exists(self, user_id: str) -> bool:
+        """
+        Verifica si un usuario ya es consultable por su ID.
+
+        Útil justo después de crearlo: mientras Azure AD propaga el objeto,
+        Graph responde 404.
+
+        Args:
+            user_id: ID del usuario
+
+        Returns:
+            True si Graph devuelve el usuario, False en caso contrario
+        """
+        status, _ = await self._request("GET", f"{GRAPH_URL}/users/{user_id}?$select=id")
+        return status == 200
 
     async def get_group_id(self, group_name: str) -> str | None:
         """
         Obtiene el ID de un grupo por su nombre.
 
-        Cachea el resultado para evitar búsquedas repetidas.
+        Cachea el resultado a nivel de módulo (compartido entre instancias) y
+        en disco con TTL, para evitar búsquedas repetidas entre ejecuciones.
 
         Args:
             group_name: Nombre del grupo (displayName)
@@ -202,39 +498,218 @@ class GraphAPIClient:
             >>> print(group_id)
             'abc123-def456-...'
         """
+        key = (self.tenant_id, group_name)
+
         # Verificar caché
-        if group_name in self._group_cache:
+        if key in _GROUP_CACHE:
             logger.debug(f"Grupo '{group_name}' encontrado en caché")
-            return self._group_cache[group_name]
+            return _GROUP_CACHE[key]
+
+        async with _group_cache_lock:
+            # Otra corrutina pudo resolverlo mientras esperábamos el lock
+            if key in _GROUP_CACHE:
+                return _GROUP_CACHE[key]
+
+            group_id = await self._lookup_group_id(group_name)
+            if group_id:
+                _GROUP_CACHE[key] = group_id
+                _save_group_cache()
+            return group_id
 
+    async def _lookup_group_id(self, group_name: str) -> str | None:
+        """Busca el ID de un grupo en Graph ($search con fallback a $filter)."""
         logger.info(f"Buscando grupo: {group_name}")
 
-        token = self.get_token()
-        headers = {"Authorization": f"Bearer {token}"}
-
-        # URL encode del nombre del grupo
-        import urllib.parse
-        encoded_name = urllib.parse.quote(group_name)
-        url = f"https://graph.microsoft.com/v1.0/groups?$filter=displayName eq '{encoded_name}'"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    groups = data.get('value', [])
-
-                    if groups:
-                        group_id = groups[0]['id']
-                        self._group_cache[group_name] = group_id
-                        logger.info(f"Grupo '{group_name}' encontrado: {group_id}")
-                        return group_id
-                    else:
-                        logger.warning(f"Grupo '{group_name}' no encontrado")
-                        return None
+        # Búsqueda indexada ($search); solo se acepta una coincidencia exacta
+        search = quote(f'"displayName:{group_name}"')
+        status, data = await self._request(
+            "GET",
+            f"{GRAPH_URL}/groups?$search={search}&$select=id,displayName",
+            headers={"ConsistencyLevel": "eventual"}
+        )
+        if status == 200:
+            wanted = group_name.lower()
+            for group in data.get('value', []):
+                if (group.get('displayName') or '').lower() == wanted:
+                    group_id = group['id']
+                    logger.info(f"Grupo '{group_name}' encontrado: {group_id}")
+                    return group_id
+        else:
+            logger.debug(f"$search de grupos no disponible (status {status}), usando $filter")
+
+        # Fallback: coincidencia exacta con $filter
+        encoded_name = quote(group_name)
+        status, data = await self._request(
+            "GET", f"{GRAPH_URL}/groups?$filter=displayName eq '{encoded_name}'"
+        )
+        if status == 200:
+            groups = data.get('value', [])
+
+            if groups:
+                group_id = groups[0]['id']
+                logger.info(f"Grupo '{group_name}' encontrado: {group_id}")
+                return group_id
+            else:
+                logger.warning(f"Grupo '{group_name}' no encontrado")
+                return None
+        else:
+            logger.error(f"Error buscando grupo '{group_name}': {data}")
+            return None
+
+    @staticmethod
+    def _build_user_body(email: str, display_name: str, password: str) -> dict:
+        """Construye el body de POST /users para un usuario."""
+        # Extraer mailNickname (parte antes del @)
+        mail_nickname = email.split('@')[0]
+
+        body = _USER_BODY_TEMPLATE.copy()
+        body["passwordProfile"] = {"password": password, "forceChangePasswordNextSignIn": True}
+        body.update(
+            displayName=display_name,
+            mailNickname=mail_nickname,
+            userPrincipalName=email,
+            mail=email
+        )
+        return body
+
+    async def _batch(self, requests: list[dict], max_retries: int = 5) -> dict[str, dict]:
+        """
+        Ejecuta hasta 20 sub-requests en un solo POST a /$batch.
+
+        Las sub-respuestas 429 (y 503 en sub-requests idempotentes) se
+        reintentan respetando su Retry-After (o backoff exponencial si no viene).
+
+        Args:
+            requests: Sub-requests en formato JSON batching de Graph
+                (id, method, url y opcionalmente body/headers)
+            max_retries: Reintentos máximos para sub-requests limitadas
+
+        Returns:
+            Dict id -> sub-respuesta ({"id", "status", "headers", "body"})
+        """
+        responses: dict[str, dict] = {}
+        pending = {req["id"]: req for req in requests}
+
+        for attempt in range(max_retries + 1):
+            status, data = await self._request(
+                "POST", f"{GRAPH_URL}/$batch", json={"requests": list(pending.values())}
+            )
+            if status != 200:
+                logger.error(f"❌ Error en batch de Graph (status {status}): {data}")
+                for req_id in pending:
+                    responses[req_id] = {"id": req_id, "status": status, "body": data}
+                return responses
+
+            throttled = {}
+            delay = 0.0
+            for sub in data.get("responses", []):
+                responses[sub["id"]] = sub
+                sub_status = sub.get("status")
+                retryable = sub_status == 429 or (
+                    sub_status == 503 and pending[sub["id"]]["method"] in IDEMPOTENT_METHODS
+                )
+                if retryable and attempt < max_retries:
+                    throttled[sub["id"]] = pending[sub["id"]]
+                    retry_after = (sub.get("headers") or {}).get("Retry-After")
+                    try:
+                        sub_delay = float(retry_after) if retry_after else 2 ** attempt
+                    except ValueError:
+                        sub_delay = 2 ** attempt  # Retry-After como fecha HTTP u otro formato
+                    delay = max(delay, sub_delay)
+
+            if not throttled:
+                break
+
+            logger.warning(f"⏳ {len(throttled)} sub-requests limitadas, reintentando en {delay:.0f}s")
+            await asyncio.sleep(delay)
+            pending = throttled
+
+        return responses
+
+    async def bulk_create_users(self, users: list[dict]) -> list[dict]:
+        """
+        Crea usuarios en lotes de 20 por request usando /$batch.
+
+        Args:
+            users: Lista de dicts con display_name, email y password
+
+        Returns:
+            Lista de resultados con el mismo formato que create_user,
+            en el mismo orden que users
+        """
+        results = []
+        for start in range(0, len(users), BATCH_SIZE):
+            chunk = users[start:start + BATCH_SIZE]
+            requests = [
+                {
+                    "id": str(i),
+                    "method": "POST",
+                    "url": "/users",
+                    "body": self._build_user_body(
+                        user['email'], user['display_name'], user['password']
+                    ),
+                    "headers": {"Content-Type": "application/json"}
+                }
+                for i, user in enumerate(chunk)
+            ]
+            responses = await self._batch(requests)
+
+            for i, user in enumerate(chunk):
+                email = user['email']
+                sub = responses.get(str(i), {})
+                if sub.get("status") == 201:
+                    user_id = sub["body"]["id"]
+                    logger.info(f"Usuario creado exitosamente: {email} (ID: {user_id})")
+                    results.append({"success": True, "user_id": user_id, "email": email})
+                else:
+                    error = sub.get("body", "Sin respuesta en el batch")
+                    logger.error(f"Error creando usuario {email}: {error}")
+                    results.append({"success": False, "email": email, "error": str(error)})
+
+        return results
+
+    async def bulk_add_members(self, user_ids: list[str], group_id: str) -> dict[str, bool]:
+        """
+        Agrega usuarios a un grupo en lotes de 20 por request usando /$batch.
+
+        Args:
+            user_ids: IDs de los usuarios
+            group_id: ID del grupo
+
+        Returns:
+            Dict user_id -> True si quedó en el grupo (incluye "ya era miembro")
+        """
+        results: dict[str, bool] = {}
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            chunk = user_ids[start:start + BATCH_SIZE]
+            requests = [
+                {
+                    "id": str(i),
+                    "method": "POST",
+                    "url": f"/groups/{group_id}/members/$ref",
+                    "body": {"@odata.id": f"{GRAPH_URL}/directoryObjects/{user_id}"},
+                    "headers": {"Content-Type": "application/json"}
+                }
+                for i, user_id in enumerate(chunk)
+            ]
+            responses = await self._batch(requests)
+
+            for i, user_id in enumerate(chunk):
+                sub = responses.get(str(i), {})
+                status = sub.get("status")
+                if status == 204:
+                    results[user_id] = True
+                elif status == 400 and any(
+                    msg in str(sub.get("body", "")).lower()
+                    for msg in ("already exist", "already a member")
+                ):
+                    logger.warning(f"Usuario {user_id} ya pertenece al grupo")
+                    results[user_id] = True
                 else:
-                    error_text = await response.text()
-                    logger.error(f"Error buscando grupo '{group_name}': {error_text}")
-                    return None
+                    logger.error(f"Error asignando usuario {user_id} a grupo (status {status}): {sub.get('body')}")
+                    results[user_id] = False
+
+        return results
 
     async def create_user(self, user_data: dict) -> dict:
         """
@@ -266,51 +741,24 @@ class GraphAPIClient:
 
         logger.info(f"Creando usuario: {email}")
 
-        token = self.get_token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-
-        # Extraer mailNickname (parte antes del @)
-        mail_nickname = email.split('@')[0]
+        body = self._build_user_body(email, display_name, password)
 
-        # Construir body del request
-        body = {
-            "accountEnabled": True,
-            "displayName": display_name,
-            "mailNickname": mail_nickname,
-            "userPrincipalName": email,
-            "mail": email,
-            "passwordProfile": {
-                "password": password,
-                "forceChangePasswordNextSignIn": True
+        status, data = await self._request("POST", f"{GRAPH_URL}/users", json=body)
+        if status == 201:
+            user_id = data['id']
+            logger.info(f"Usuario creado exitosamente: {email} (ID: {user_id})")
+            return {
+                "success": True,
+                "user_id": user_id,
+                "email": email
+            }
+        else:
+            logger.error(f"Error creando usuario {email}: {data}")
+            return {
+                "success": False,
+                "email": email,
+                "error": data
             }
-        }
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                "https://graph.microsoft.com/v1.0/users",
-                headers=headers,
-                json=body
-            ) as response:
-                if response.status == 201:
-                    data = await response.json()
-                    user_id = data['id']
-                    logger.info(f"Usuario creado exitosamente: {email} (ID: {user_id})")
-                    return {
-                        "success": True,
-                        "user_id": user_id,
-                        "email": email
-                    }
-                else:
-                    error_text = await response.text()
-                    logger.error(f"Error creando usuario {email}: {error_text}")
-                    return {
-                        "success": False,
-                        "email": email,
-                        "error": error_text
-                    }
 
     async def add_user_to_group(self, user_id: str, group_id: str, group_name: str = "") -> bool:
         """
@@ -333,42 +781,31 @@ class GraphAPIClient:
         """
         logger.info(f"Asignando usuario {user_id} a grupo: {group_name or group_id}")
 
-        token = self.get_token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-
         # CORREGIDO: Usar directoryObjects en lugar de users
         body = {
-            "@odata.id": f"https://graph.microsoft.com/v1.0/directoryObjects/{user_id}"
+            "@odata.id": f"{GRAPH_URL}/directoryObjects/{user_id}"
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"https://graph.microsoft.com/v1.0/groups/{group_id}/members/$ref",
-                headers=headers,
-                json=body
-            ) as response:
-                if response.status == 204:
-                    # BUG FIX: Confiar en el status 204, no verificar inmediatamente
-                    # La verificación inmediata falla por propagación en Azure AD
-                    logger.info(f"Usuario asignado a grupo exitosamente")
-                    return True
-
-                elif response.status == 400:
-                    error_text = await response.text()
-                    # BUG FIX: Microsoft dice "already exist" sin 's'
-                    if "already exist" in error_text.lower() or "already a member" in error_text.lower():
-                        logger.warning(f"Usuario ya pertenece al grupo")
-                        return True
-                    else:
-                        logger.error(f"Error 400 asignando usuario: {error_text}")
-                        return False
-                else:
-                    error_text = await response.text()
-                    logger.error(f"Error asignando usuario a grupo (status {response.status}): {error_text}")
-                    return False
+        status, error_text = await self._request(
+            "POST", f"{GRAPH_URL}/groups/{group_id}/members/$ref", json=body
+        )
+        if status == 204:
+            # BUG FIX: Confiar en el status 204, no verificar inmediatamente
+            # La verificación inmediata falla por propagación en Azure AD
+            logger.info(f"Usuario asignado a grupo exitosamente")
+            return True
+
+        elif status == 400:
+            # BUG FIX: Microsoft dice "already exist" sin 's'
+            if "already exist" in error_text.lower() or "already a member" in error_text.lower():
+                logger.warning(f"Usuario ya pertenece al grupo")
+                return True
+            else:
+                logger.error(f"Error 400 asignando usuario: {error_text}")
+                return False
+        else:
+            logger.error(f"Error asignando usuario a grupo (status {status}): {error_text}")
+            return False
 
     async def verify_user_in_group(self, user_id: str, group_id: str) -> bool:
         """
@@ -389,31 +826,87 @@ class GraphAPIClient:
         """
         logger.debug(f"Verificando si usuario {user_id} está en grupo {group_id}")
 
-        token = self.get_token()
-        headers = {"Authorization": f"Bearer {token}"}
-
-        async with aiohttp.ClientSession() as session:
-            # Obtener todos los miembros del grupo
-            async with session.get(
-                f"https://graph.microsoft.com/v1.0/groups/{group_id}/members",
-                headers=headers
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    members = data.get('value', [])
-
-                    # Buscar el usuario en la lista
-                    for member in members:
-                        if member.get('id') == user_id:
-                            logger.debug(f"Usuario encontrado en grupo")
-                            return True
-
-                    logger.debug(f"Usuario NO encontrado en grupo")
-                    return False
+        # Consulta directa de la membresía: 200 si es miembro, 404 si no
+        status, data = await self._request(
+            "GET", f"{GRAPH_URL}/groups/{group_id}/members/{user_id}"
+        )
+        if status == 200:
+            logger.debug(f"Usuario encontrado en grupo")
+            return True
+        elif status == 404:
+            logger.debug(f"Usuario NO encontrado en grupo")
+            return False
+        else:
+            logger.error(f"Error verificando membresía: {data}")
+            return False
+
+    @staticmethod
+    def _build_mail_body(to_email: str, subject: str, body_html: str) -> dict:
+        """Construye el body de POST /users/{remitente}/sendMail."""
+        return {
+            "message": {
+                "subject": subject,
+                "body": {
+                    "contentType": "HTML",
+                    "content": body_html
+                },
+                "toRecipients": [
+                    {
+                        "emailAddress": {
+                            "address": to_email
+                        }
+                    }
+                ]
+            },
+            "saveToSentItems": False
+        }
+
+    async def bulk_send_emails(
+        self,
+        messages: list[dict],
+        from_email: str = None
+    ) -> list[dict]:
+        """
+        Envía correos en lotes de 20 por request usando /$batch.
+
+        Args:
+            messages: Lista de dicts con to_email, subject y body_html
+            from_email: Dirección del remitente (opcional, usa settings.email_sender_address por defecto)
+
+        Returns:
+            Lista de dicts {"success": bool, "error": ...} en el mismo orden que messages
+        """
+        if from_email is None:
+            from_email = settings.email_sender_address
+
+        results = []
+        for start in range(0, len(messages), BATCH_SIZE):
+            chunk = messages[start:start + BATCH_SIZE]
+            requests = [
+                {
+                    "id": str(i),
+                    "method": "POST",
+                    "url": f"/users/{from_email}/sendMail",
+                    "body": self._build_mail_body(
+                        message['to_email'], message['subject'], message['body_html']
+                    ),
+                    "headers": {"Content-Type": "application/json"}
+                }
+                for i, message in enumerate(chunk)
+            ]
+            responses = await self._batch(requests)
+
+            for i, message in enumerate(chunk):
+                sub = responses.get(str(i), {})
+                if sub.get("status") == 202:
+                    logger.debug(f"Correo enviado exitosamente a {message['to_email']}")
+                    results.append({"success": True})
                 else:
-                    error_text = await response.text()
-                    logger.error(f"Error verificando membresía: {error_text}")
-                    return False
+                    error = sub.get("body", "Sin respuesta en el batch")
+                    logger.error(f"Error enviando correo a {message['to_email']} (status {sub.get('status')}): {error}")
+                    results.append({"success": False, "error": str(error)})
+
+        return results
 
     async def send_email(
         self,
@@ -441,49 +934,20 @@ class GraphAPIClient:
             ...     body_html="<p>Hola</p>"
             ... )
         """
-        from app.config import get_settings
-        settings = get_settings()
-
         if from_email is None:
             from_email = settings.email_sender_address
 
-        token = token = self.get_token()
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-
         # Endpoint para enviar correo
-        url = f"https://graph.microsoft.com/v1.0/users/{from_email}/sendMail"
-
-        # Cuerpo del request
-        payload = {
-            "message": {
-                "subject": subject,
-                "body": {
-                    "contentType": "HTML",
-                    "content": body_html
-                },
-                "toRecipients": [
-                    {
-                        "emailAddress": {
-                            "address": to_email
-                        }
-                    }
-                ]
-            },
-            "saveToSentItems": False
-        }
+        url = f"{GRAPH_URL}/users/{from_email}/sendMail"
+        payload = self._build_mail_body(to_email, subject, body_html)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                if response.status == 202:
-                    logger.debug(f"Correo enviado exitosamente a {to_email}")
-                    return True
-                else:
-                    error_text = await response.text()
-                    logger.error(f"Error enviando correo (status {response.status}): {error_text}")
-                    return False
+        status, error_text = await self._request("POST", url, json=payload)
+        if status == 202:
+            logger.debug(f"Correo enviado exitosamente a {to_email}")
+            return True
+        else:
+            logger.error(f"Error enviando correo (status {status}): {error_text}")
+            return False
 
 
 # Singleton
@@ -494,4 +958,10 @@ def get_graph_client() -> GraphAPIClient:
     global _graph_client
     if _graph_client is None:
         _graph_client = GraphAPIClient()
-    return _graph_client
\ No newline at end of file
+    return _graph_client
+
+
+async def close_graph_client() -> None:
+    """Cierra la sesión HTTP de la instancia única (si se creó)."""
+    if _graph_client is not None:
+        await _graph_client.close()
@@ -8,6 +8,14 @@ los requisitos de seguridad de Office 365.
 import secrets
 import string
 
+# Caracteres permitidos (sin ambiguos)
+UPPERCASE = 'ABCDEFGHJKLMNPQRSTUVWXYZ'  # Sin I, O
+LOWERCASE = 'abcdefghjkmnpqrstuvwxyz'   # Sin l, o
+DIGITS = '23456789'                      # Sin 0, 1
+SYMBOLS = '@#$%&*+=?'                    # Símbolos seguros y fáciles de escribir
+
+_ALL = UPPERCASE + LOWERCASE + DIGITS + SYMBOLS
+
 
 def generate_secure_password(length: int = 12) -> str:
     """
@@ -36,27 +44,19 @@ def generate_secure_password(length: int = 12) -> str:
     if length < 8:
         raise ValueError("La contraseña debe tener al menos 8 caracteres")
 
-    # Definir caracteres permitidos (sin ambiguos)
-    uppercase = 'ABCDEFGHJKLMNPQRSTUVWXYZ'  # Sin I, O
-    lowercase = 'abcdefghjkmnpqrstuvwxyz'   # Sin l, o
-    digits = '23456789'                      # Sin 0, 1
-    symbols = '@#$%&*+=?'                    # Símbolos seguros y fáciles de escribir
-
-    # Combinar todos los caracteres
-    all_chars = uppercase + lowercase + digits + symbols
-
-    # Generar contraseña asegurando al menos un carácter de cada tipo
-    while True:
-        password = ''.join(secrets.choice(all_chars) for _ in range(length))
+    # Un carácter de cada tipo garantizado, el resto del alfabeto completo,
+    # y mezcla final para que su posición no sea predecible
+    rng = secrets.SystemRandom()
+    chars = [
+        rng.choice(UPPERCASE),
+        rng.choice(LOWERCASE),
+        rng.choice(DIGITS),
+        rng.choice(SYMBOLS)
+    ]
+    chars += [rng.choice(_ALL) for _ in range(length - 4)]
+    rng.shuffle(chars)
 
-        # Validar que tenga al menos un carácter de cada tipo
-        has_upper = any(c in uppercase for c in password)
-        has_lower = any(c in lowercase for c in password)
-        has_digit = any(c in digits for c in password)
-        has_symbol = any(c in symbols for c in password)
-
-        if has_upper and has_lower and has_digit and has_symbol:
-            return password
+    return ''.join(chars)
 
 
 def generate_passwords(count: int, length: int = 12) -> list[str]:
@@ -75,9 +75,15 @@ def generate_passwords(count: int, length: int = 12) -> list[str]:
         >>> len(passwords)
         5
     """
-    passwords = set()
-
-    while len(passwords) < count:
-        passwords.add(generate_secure_password(length))
-
-    return list(passwords)
+    passwords = [generate_secure_password(length) for _ in range(count)]
+
+    # Una colisión es prácticamente imposible; si ocurre, regenerar solo esa
+    if len(set(passwords)) != count:
+        unique = list(dict.fromkeys(passwords))
+        while len(unique) < count:
+            password = generate_secure_password(length)
+            if password not in unique:
+                unique.append(password)
+        passwords = unique
+
+    return passwords
@@ -5,8 +5,11 @@ Genera reportes detallados del proceso de automatización de usuarios
 para auditoría, seguimiento y presentación a directivos.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from itertools import islice
 from typing import Optional
 from loguru import logger
 
@@ -16,16 +19,24 @@ from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
+    SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle,
     PageBreak, Image
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
 # Excel
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.utils import get_column_letter
 
+try:
+    import lxml  # noqa: F401 - openpyxl lo detecta y usa su serializador XML incremental
+except ImportError:
+    logger.warning("⚠️ lxml no instalado — openpyxl usará el writer XML en Python puro (~2-3x más lento)")
+
 
 class ReportGenerator:
     """Genera reportes profesionales del proceso de automatización."""
@@ -37,13 +48,36 @@ class ReportGenerator:
     COLOR_WARNING = colors.HexColor("#ffc107")
     COLOR_GRAY_BG = colors.HexColor("#f8f9fa")
 
-    # Colores Excel (hex strings sin #)
-    EXCEL_HEADER_BG = "003366"
-    EXCEL_HEADER_FG = "FFFFFF"
-    EXCEL_SUCCESS_BG = "d4edda"
-    EXCEL_ERROR_BG = "f8d7da"
-    EXCEL_WARNING_BG = "fff3cd"
-    EXCEL_BORDER = "dee2e6"
+    # Máximo de usuarios en la tabla del PDF (el listado completo va en el Excel)
+    PDF_USER_LIMIT = 50
+
+    # Colores Excel (ARGB de 8 caracteres: openpyxl no tiene que normalizarlos)
+    EXCEL_HEADER_BG = "FF003366"
+    EXCEL_HEADER_FG = "FFFFFFFF"
+    EXCEL_SUCCESS_BG = "FFD4EDDA"
+    EXCEL_ERROR_BG = "FFF8D7DA"
+    EXCEL_WARNING_BG = "FFFFF3CD"
+    EXCEL_BORDER = "FFDEE2E6"
+
+    # Estilos Excel compartidos: los estilos de openpyxl son inmutables, así
+    # que se crean una sola vez y se reutilizan en todas las celdas
+    EXCEL_HEADER_FONT = Font(name='Calibri', size=11, bold=True, color=EXCEL_HEADER_FG)
+    EXCEL_HEADER_FILL = PatternFill(start_color=EXCEL_HEADER_BG, end_color=EXCEL_HEADER_BG, fill_type='solid')
+    EXCEL_HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    EXCEL_TITLE_FONT = Font(name='Calibri', size=16, bold=True, color=EXCEL_HEADER_BG)
+    EXCEL_BOLD_FONT = Font(bold=True)
+    EXCEL_BORDER_STYLE = Border(
+        left=Side(style='thin', color=EXCEL_BORDER),
+        right=Side(style='thin', color=EXCEL_BORDER),
+        top=Side(style='thin', color=EXCEL_BORDER),
+        bottom=Side(style='thin', color=EXCEL_BORDER)
+    )
+    EXCEL_SUCCESS_FILL = PatternFill(start_color=EXCEL_SUCCESS_BG, end_color=EXCEL_SUCCESS_BG, fill_type='solid')
+    EXCEL_ERROR_FILL = PatternFill(start_color=EXCEL_ERROR_BG, end_color=EXCEL_ERROR_BG, fill_type='solid')
+    EXCEL_WARNING_FILL = PatternFill(start_color=EXCEL_WARNING_BG, end_color=EXCEL_WARNING_BG, fill_type='solid')
+    EXCEL_ALIGN_LEFT = Alignment(horizontal='left')
+    EXCEL_ALIGN_CENTER = Alignment(horizontal='center')
+    EXCEL_ALIGN_MIDDLE = Alignment(vertical='center')
 
     def __init__(self, output_dir: str = "logs/reportes"):
         """
@@ -55,9 +89,18 @@ class ReportGenerator:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._styles_cache = None  # Estilos PDF, se construyen en el primer uso
 
     def _create_pdf_styles(self):
-        """Crea estilos personalizados para el PDF."""
+        """
+        Crea estilos personalizados para el PDF.
+
+        Se construyen una vez por instancia; los ParagraphStyle solo se leen
+        durante doc.build, así que se comparten entre reportes.
+        """
+        if self._styles_cache is not None:
+            return self._styles_cache
+
         styles = getSampleStyleSheet()
 
         # Título principal
@@ -100,8 +143,82 @@ class ReportGenerator:
             spaceAfter=6
         ))
 
+        self._styles_cache = styles
         return styles
 
+    @staticmethod
+    def _display_name(user: dict) -> str:
+        """
+        Nombre completo del usuario para los reportes.
+
+        Usa el display_name que calcula UserProcessor; para datos que no lo
+        traen (p. ej. JSON de ejecuciones anteriores) lo arma con nombres y
+        apellidos. No modifica el dict del usuario.
+        """
+        return user.get('display_name') or f"{user.get('full_name', '')} {user.get('full_last_name', '')}"
+
+    def _iter_errors(self, data: dict):
+        """
+        Genera las filas de la hoja Errores de las tres plataformas.
+
+        Yields:
+            Tuplas (usuario, plataforma, error, fecha, acción requerida)
+        """
+        ts = self.timestamp
+
+        for user in data.get('office365_results', {}).get('failed', []):
+            yield (
+                self._display_name(user),
+                "Office 365",
+                user.get('creation_error', 'Error desconocido'),
+                ts,
+                "Revisar y reintentar creación manual"
+            )
+
+        for user in data.get('appconnecto_results', {}).get('failed', []):
+            yield (
+                self._display_name(user),
+                "AppConnecto",
+                "Error en creación",
+                ts,
+                "Crear manualmente en AppConnecto"
+            )
+
+        for item in data.get('email_results', {}).get('failed', []):
+            yield (
+                item.get('name', 'N/A'),
+                "Email",
+                item.get('error', 'Error desconocido'),
+                ts,
+                "Reenviar credenciales manualmente"
+            )
+
+    @classmethod
+    def _pdf_user_row(cls, i: int, user: dict) -> list[str]:
+        """Fila de la tabla de usuarios del PDF (textos ya truncados)."""
+        status = user.get('status')
+
+        # Símbolos de status más legibles
+        # Office 365: SI (creado), YA EXISTE (ya existía), NO (error al crear)
+        if user.get('office365_created'):
+            o365_status = "SI"
+        elif status == 'existing':
+            o365_status = "YA EXISTE"
+        else:
+            o365_status = "NO"
+
+        return [
+            str(i),
+            cls._display_name(user)[:25],  # Truncar nombres largos
+            user.get('identification_id', 'N/A'),
+            user.get('institutional_email', 'N/A')[:30],  # Truncar emails largos
+            o365_status,
+            # AppConnecto: SI (nuevo), YA EXISTE (ya estaba)
+            "SI" if status == 'new' else "YA EXISTE",
+            # Email: SI (enviado), - (no aplica)
+            "SI" if user.get('password_generated') else "-"
+        ]
+
     def generate_pdf_report(self, data: dict) -> str:
         """
         Genera reporte PDF profesional.
@@ -128,7 +245,7 @@ class ReportGenerator:
         # Información del proceso
         info_data = [
             ["Fecha del proceso:", data.get('timestamp', datetime.now().isoformat())],
-            ["Archivo procesado:", Path(data.get('excel_file', 'N/A')).name],
+            ["Archivo procesado:", os.path.basename(data.get('excel_file') or 'N/A')],
         ]
         info_table = Table(info_data, colWidths=[2*inch, 4*inch])
         info_table.setStyle(TableStyle([
@@ -184,44 +301,18 @@ class ReportGenerator:
 
         users = data.get('users', [])
         if users:
-            # Limitar a primeros 50 usuarios para no saturar el PDF
-            users_to_show = users[:50]
-
             users_data = [["#", "Nombre", "ID", "Email", "O365", "App", "Email"]]
+            # Limitar a los primeros PDF_USER_LIMIT usuarios para no saturar el PDF
+            users_data.extend(
+                self._pdf_user_row(i, user)
+                for i, user in enumerate(islice(users, self.PDF_USER_LIMIT), 1)
+            )
 
-            for i, user in enumerate(users_to_show, 1):
-                name = f"{user.get('full_name', '')} {user.get('full_last_name', '')}"
-                id_num = user.get('identification_id', 'N/A')
-                email = user.get('institutional_email', 'N/A')
-
-                # Símbolos de status más legibles
-                # Office 365: SI (creado), YA EXISTE (ya existía), NO (error al crear)
-                if user.get('office365_created'):
-                    o365_status = "SI"
-                elif user.get('status') == 'existing':
-                    o365_status = "YA EXISTE"
-                else:
-                    o365_status = "NO"
-
-                # AppConnecto: SI (nuevo), YA EXISTE (ya estaba)
-                app_status = "SI" if user.get('status') == 'new' else "YA EXISTE"
-
-                # Email: SI (enviado), - (no aplica)
-                email_status = "SI" if user.get('password_generated') else "-"
-
-                users_data.append([
-                    str(i),
-                    name[:25],  # Truncar nombres largos
-                    id_num,
-                    email[:30],  # Truncar emails largos
-                    o365_status,
-                    app_status,
-                    email_status
-                ])
-
-            users_table = Table(
+            # LongTable parte la tabla por filas y repite el encabezado en cada página
+            users_table = LongTable(
                 users_data,
-                colWidths=[0.3*inch, 1.6*inch, 0.8*inch, 1.8*inch, 0.7*inch, 0.7*inch, 0.5*inch]
+                colWidths=[0.3*inch, 1.6*inch, 0.8*inch, 1.8*inch, 0.7*inch, 0.7*inch, 0.5*inch],
+                repeatRows=1
             )
             users_table.setStyle(TableStyle([
                 # Encabezado
@@ -245,10 +336,10 @@ class ReportGenerator:
             ]))
             story.append(users_table)
 
-            if len(users) > 50:
+            if len(users) > self.PDF_USER_LIMIT:
                 story.append(Spacer(1, 0.2*inch))
                 story.append(Paragraph(
-                    f"<i>Nota: Se muestran los primeros 50 usuarios de {len(users)} totales. "
+                    f"<i>Nota: Se muestran los primeros {self.PDF_USER_LIMIT} usuarios de {len(users)} totales. "
                     "Consulte el reporte Excel para el listado completo.</i>",
                     styles['CustomNormal']
                 ))
@@ -266,7 +357,7 @@ class ReportGenerator:
             if office365_failed:
                 story.append(Paragraph("<b>Office 365:</b>", styles['CustomNormal']))
                 for user in office365_failed[:10]:  # Primeros 10
-                    name = f"{user.get('full_name', '')} {user.get('full_last_name', '')}"
+                    name = self._display_name(user)
                     error = user.get('creation_error', 'Error desconocido')
                     story.append(Paragraph(f"• {name}: {error}", styles['CustomNormal']))
                 story.append(Spacer(1, 0.1*inch))
@@ -274,7 +365,7 @@ class ReportGenerator:
             if appconnecto_failed:
                 story.append(Paragraph("<b>AppConnecto:</b>", styles['CustomNormal']))
                 for user in appconnecto_failed[:10]:
-                    name = f"{user.get('full_name', '')} {user.get('full_last_name', '')}"
+                    name = self._display_name(user)
                     story.append(Paragraph(f"• {name}", styles['CustomNormal']))
                 story.append(Spacer(1, 0.1*inch))
 
@@ -285,21 +376,18 @@ class ReportGenerator:
                     error = item.get('error', 'Error desconocido')
                     story.append(Paragraph(f"• {name}: {error}", styles['CustomNormal']))
 
-        # Pie de página
+        # Pie de página (texto y posiciones calculados una vez, no por página)
+        footer_text = f"Generado automáticamente por Sistema de Automatización ECR - {self.timestamp}"
+        footer_y = 0.5*inch
+        page_x = letter[0] - inch
+        grey = colors.grey
+
         def add_footer(canvas, doc):
             canvas.saveState()
             canvas.setFont('Helvetica', 8)
-            canvas.setFillColor(colors.grey)
-            canvas.drawString(
-                inch,
-                0.5*inch,
-                f"Generado automáticamente por Sistema de Automatización ECR - {self.timestamp}"
-            )
-            canvas.drawRightString(
-                letter[0] - inch,
-                0.5*inch,
-                f"Página {canvas.getPageNumber()}"
-            )
+            canvas.setFillColor(grey)
+            canvas.drawString(inch, footer_y, footer_text)
+            canvas.drawRightString(page_x, footer_y, f"Página {canvas.getPageNumber()}")
             canvas.restoreState()
 
         # Construir PDF
@@ -308,93 +396,68 @@ class ReportGenerator:
         logger.info(f"✅ Reporte PDF generado: {filename}")
         return str(filename)
 
-    def generate_excel_report(self, data: dict) -> str:
+    def _excel_formats(self, wb: Workbook) -> dict[str, str]:
         """
-        Genera reporte Excel detallado.
+        Registra una sola vez en el workbook los formatos usados por el reporte.
+
+        Equivale a los format objects de XlsxWriter: cada combinación de
+        estilos se registra como NamedStyle, y las celdas solo referencian
+        ese estilo por nombre en lugar de asignar fuente, relleno, borde y
+        alineación por celda.
 
         Args:
-            data: Mismo diccionario que generate_pdf_report
+            wb: Workbook del reporte
 
         Returns:
-            Ruta del archivo Excel generado
+            Dict nombre_formato -> nombre del NamedStyle registrado
         """
-        logger.info("Generando reporte Excel...")
-
-        filename = self.output_dir / f"reporte_{self.timestamp}.xlsx"
-        wb = Workbook()
-
-        # Estilos comunes
-        header_font = Font(name='Calibri', size=11, bold=True, color=self.EXCEL_HEADER_FG)
-        header_fill = PatternFill(start_color=self.EXCEL_HEADER_BG, end_color=self.EXCEL_HEADER_BG, fill_type='solid')
-        header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-
-        border_side = Side(style='thin', color=self.EXCEL_BORDER)
-        border = Border(left=border_side, right=border_side, top=border_side, bottom=border_side)
-
-        # HOJA 1 - RESUMEN
-        ws_resumen = wb.active
-        ws_resumen.title = "Resumen"
-
-        # Título
-        ws_resumen['A1'] = "Reporte de Automatización de Usuarios"
-        ws_resumen['A1'].font = Font(name='Calibri', size=16, bold=True, color=self.EXCEL_HEADER_BG)
-        ws_resumen.merge_cells('A1:C1')
-
-        # Información del proceso
-        ws_resumen['A3'] = "Fecha del proceso:"
-        ws_resumen['B3'] = data.get('timestamp', datetime.now().isoformat())
-        ws_resumen['A4'] = "Archivo procesado:"
-        ws_resumen['B4'] = Path(data.get('excel_file', 'N/A')).name
-
-        ws_resumen['A3'].font = Font(bold=True)
-        ws_resumen['A4'].font = Font(bold=True)
-
-        # Tabla de resumen
-        ws_resumen['A6'] = "Métrica"
-        ws_resumen['B6'] = "Cantidad"
-        ws_resumen['C6'] = "Porcentaje"
-
-        summary = data.get('summary', {})
-        total = summary.get('total_in_excel', 1)  # Evitar división por cero
-
-        metrics = [
-            ("Total en Excel", summary.get('total_in_excel', 0)),
-            ("Nuevos procesados", summary.get('new_users', 0)),
-            ("Ya existentes", summary.get('existing_users', 0)),
-            ("Creados Office 365", summary.get('office365_created', 0)),
-            ("Creados AppConnecto", summary.get('appconnecto_created', 0)),
-            ("Correos enviados", summary.get('emails_sent', 0)),
-        ]
-
-        row = 7
-        for metric, count in metrics:
-            ws_resumen[f'A{row}'] = metric
-            ws_resumen[f'B{row}'] = count
-            percentage = (count / total * 100) if total > 0 else 0
-            ws_resumen[f'C{row}'] = f"{percentage:.1f}%"
-            row += 1
-
-        # Aplicar estilos a encabezado
-        for col in ['A', 'B', 'C']:
-            cell = ws_resumen[f'{col}6']
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = border
-
-        # Aplicar bordes a datos
-        for r in range(7, row):
-            for col in ['A', 'B', 'C']:
-                ws_resumen[f'{col}{r}'].border = border
-                ws_resumen[f'{col}{r}'].alignment = Alignment(horizontal='left' if col == 'A' else 'center')
+        border = self.EXCEL_BORDER_STYLE
+        specs = {
+            "header": dict(
+                font=self.EXCEL_HEADER_FONT,
+                fill=self.EXCEL_HEADER_FILL,
+                alignment=self.EXCEL_HEADER_ALIGNMENT,
+                border=border
+            ),
+            "title": dict(font=self.EXCEL_TITLE_FONT),
+            "bold": dict(font=self.EXCEL_BOLD_FONT),
+            "metric": dict(alignment=self.EXCEL_ALIGN_LEFT, border=border),
+            "metric_value": dict(alignment=self.EXCEL_ALIGN_CENTER, border=border),
+            "success": dict(fill=self.EXCEL_SUCCESS_FILL, alignment=self.EXCEL_ALIGN_MIDDLE, border=border),
+            "error": dict(fill=self.EXCEL_ERROR_FILL, alignment=self.EXCEL_ALIGN_MIDDLE, border=border),
+            "warning": dict(fill=self.EXCEL_WARNING_FILL, alignment=self.EXCEL_ALIGN_MIDDLE, border=border),
+            "bordered": dict(border=border),
+        }
 
-        # Ajustar anchos
-        ws_resumen.column_dimensions['A'].width = 30
-        ws_resumen.column_dimensions['B'].width = 12
-        ws_resumen.column_dimensions['C'].width = 12
+        formats = {}
+        for name, styles in specs.items():
+            # Fuente y borde por defecto del workbook: NamedStyle los dejaría vacíos
+            styles = {"font": DEFAULT_FONT, "border": DEFAULT_BORDER, **styles}
+            style = NamedStyle(name=f"ECR {name}", **styles)
+            wb.add_named_style(style)
+            formats[name] = style.name
+        return formats
+
+    @staticmethod
+    def _cell(ws, value, fmt: str) -> WriteOnlyCell:
+        """Crea una celda write-only con un formato de _excel_formats."""
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = fmt
+        return cell
+
+    def _write_users_sheet(self, ws_users, users: list[dict], fmt: dict[str, str]) -> None:
+        """
+        Escribe la hoja Usuarios (una fila por usuario, coloreada según status).
 
-        # HOJA 2 - USUARIOS
-        ws_users = wb.create_sheet("Usuarios")
+        Args:
+            ws_users: Hoja write-only recién creada
+            users: Usuarios del proceso
+            fmt: Formatos de _excel_formats
+        """
+        if not users:
+            # Corrida sin usuarios: una fila informativa, sin anchos/filtros/paneles
+            ws_users.append(["(sin usuarios procesados)"])
+            return
 
         headers = [
             "Nombre", "Apellido", "Identificación", "Tipo Doc", "Email Personal",
@@ -403,136 +466,162 @@ class ReportGenerator:
             "Password", "Observaciones"
         ]
 
-        for col_num, header in enumerate(headers, 1):
-            cell = ws_users.cell(row=1, column=col_num)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = border
+        # Ajustar anchos
+        column_widths = [15, 15, 12, 10, 25, 25, 15, 30, 12, 10, 12, 12, 15, 40]
+        for i, width in enumerate(column_widths, 1):
+            ws_users.column_dimensions[get_column_letter(i)].width = width
+
+        # Filtros
+        ws_users.auto_filter.ref = f"A1:{get_column_letter(len(headers))}{len(users) + 1}"
+
+        # Congelar primera fila
+        ws_users.freeze_panes = "A2"
+
+        ws_users.append([self._cell(ws_users, header, fmt["header"]) for header in headers])
 
         # Llenar datos
-        users = data.get('users', [])
-        for row_num, user in enumerate(users, 2):
-            ws_users.cell(row=row_num, column=1, value=user.get('full_name', ''))
-            ws_users.cell(row=row_num, column=2, value=user.get('full_last_name', ''))
-            ws_users.cell(row=row_num, column=3, value=user.get('identification_id', ''))
-            ws_users.cell(row=row_num, column=4, value=user.get('type_document', ''))
-            ws_users.cell(row=row_num, column=5, value=user.get('email_personal', ''))
-            ws_users.cell(row=row_num, column=6, value=user.get('institutional_email', ''))
-            ws_users.cell(row=row_num, column=7, value=user.get('vinculation_type', ''))
-            ws_users.cell(row=row_num, column=8, value=user.get('academic_program', ''))
-
-            # Status
+        success_fmt, error_fmt, warning_fmt = fmt["success"], fmt["error"], fmt["warning"]
+
+        # Celdas de status (Office 365, AppConnecto, Correo Enviado): pocos
+        # valores posibles, así que se crea una sola celda por (texto, formato)
+        # y se reutiliza. El modo write-only serializa cada celda al hacer
+        # append, después de asignarle fila/columna, por lo que compartirla es seguro.
+        new_cell = self._cell
+        status_cells: dict[tuple[str, str], WriteOnlyCell] = {}
+
+        def status_cell(text: str, row_fmt: str) -> WriteOnlyCell:
+            key = (text, row_fmt)
+            cell = status_cells.get(key)
+            if cell is None:
+                cell = status_cells[key] = self._cell(ws_users, text, row_fmt)
+            return cell
+
+        for user in users:
+            # Leer cada campo de status una sola vez
             status = user.get('status', 'unknown')
-            ws_users.cell(row=row_num, column=9, value=status)
+            o365_created = user.get('office365_created')
+            password = user.get('password_generated', '')  # Solo si fue generado
+            has_error = 'creation_error' in user
 
             # Usar texto claro en lugar de símbolos Unicode
             # Office 365: SI (creado), YA EXISTE (ya existía), NO (error al crear)
-            if user.get('office365_created'):
+            if o365_created:
                 o365 = "SI"
             elif status == 'existing':
                 o365 = "YA EXISTE"
             else:
                 o365 = "NO"
-            ws_users.cell(row=row_num, column=10, value=o365)
 
             # AppConnecto: SI (nuevo), YA EXISTE (ya estaba)
             app = "SI" if status == 'new' else "YA EXISTE"
-            ws_users.cell(row=row_num, column=11, value=app)
-
-            email_sent = "SI" if user.get('password_generated') else "NO"
-            ws_users.cell(row=row_num, column=12, value=email_sent)
-
-            # Password (solo si fue generado)
-            password = user.get('password_generated', '')
-            ws_users.cell(row=row_num, column=13, value=password)
 
             # Observaciones
-            obs = user.get('creation_error', user.get('status_message', ''))
-            ws_users.cell(row=row_num, column=14, value=obs)
-
-            # Aplicar bordes
-            for col in range(1, 15):
-                ws_users.cell(row=row_num, column=col).border = border
-                ws_users.cell(row=row_num, column=col).alignment = Alignment(vertical='center')
+            obs = user['creation_error'] if has_error else user.get('status_message', '')
 
             # Color de fondo según status
-            if user.get('office365_created'):
-                fill = PatternFill(start_color=self.EXCEL_SUCCESS_BG, end_color=self.EXCEL_SUCCESS_BG, fill_type='solid')
-            elif user.get('creation_error'):
-                fill = PatternFill(start_color=self.EXCEL_ERROR_BG, end_color=self.EXCEL_ERROR_BG, fill_type='solid')
+            if o365_created:
+                row_fmt = success_fmt
+            elif has_error and user['creation_error']:
+                row_fmt = error_fmt
             else:
-                fill = PatternFill(start_color=self.EXCEL_WARNING_BG, end_color=self.EXCEL_WARNING_BG, fill_type='solid')
+                row_fmt = warning_fmt
+
+            ws_users.append([
+                new_cell(ws_users, user.get('full_name', ''), row_fmt),
+                new_cell(ws_users, user.get('full_last_name', ''), row_fmt),
+                new_cell(ws_users, user.get('identification_id', ''), row_fmt),
+                new_cell(ws_users, user.get('type_document', ''), row_fmt),
+                new_cell(ws_users, user.get('email_personal', ''), row_fmt),
+                new_cell(ws_users, user.get('institutional_email', ''), row_fmt),
+                new_cell(ws_users, user.get('vinculation_type', ''), row_fmt),
+                new_cell(ws_users, user.get('academic_program', ''), row_fmt),
+                new_cell(ws_users, status, row_fmt),
+                status_cell(o365, row_fmt),
+                status_cell(app, row_fmt),
+                status_cell("SI" if password else "NO", row_fmt),
+                new_cell(ws_users, password, row_fmt),
+                new_cell(ws_users, obs, row_fmt),
+            ])
 
-            for col in range(1, 15):
-                ws_users.cell(row=row_num, column=col).fill = fill
+    def generate_excel_report(self, data: dict) -> str:
+        """
+        Genera reporte Excel detallado.
 
-        # Ajustar anchos
-        column_widths = [15, 15, 12, 10, 25, 25, 15, 30, 12, 10, 12, 12, 15, 40]
-        for i, width in enumerate(column_widths, 1):
-            ws_users.column_dimensions[get_column_letter(i)].width = width
+        Usa el modo write-only de openpyxl: las filas se escriben en streaming
+        al archivo en lugar de mantener todas las celdas en memoria. Por eso
+        anchos, paneles congelados y filtros se definen antes de las filas.
 
-        # Filtros
-        ws_users.auto_filter.ref = f"A1:{get_column_letter(len(headers))}{len(users) + 1}"
+        Args:
+            data: Mismo diccionario que generate_pdf_report
 
-        # Congelar primera fila
-        ws_users.freeze_panes = "A2"
+        Returns:
+            Ruta del archivo Excel generado
+        """
+        logger.info("Generando reporte Excel...")
 
-        # HOJA 3 - ERRORES
-        ws_errors = wb.create_sheet("Errores")
+        filename = self.output_dir / f"reporte_{self.timestamp}.xlsx"
+        wb = Workbook(write_only=True)
 
-        error_headers = ["Usuario", "Plataforma", "Error", "Fecha", "Acción Requerida"]
-        for col_num, header in enumerate(error_headers, 1):
-            cell = ws_errors.cell(row=1, column=col_num)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = border
+        # HOJA 1 - RESUMEN
+        ws_resumen = wb.create_sheet("Resumen")
+        fmt = self._excel_formats(wb)
 
-        # Recopilar errores
-        error_row = 2
-        office365_failed = data.get('office365_results', {}).get('failed', [])
-        for user in office365_failed:
-            name = f"{user.get('full_name', '')} {user.get('full_last_name', '')}"
-            ws_errors.cell(row=error_row, column=1, value=name)
-            ws_errors.cell(row=error_row, column=2, value="Office 365")
-            ws_errors.cell(row=error_row, column=3, value=user.get('creation_error', 'Error desconocido'))
-            ws_errors.cell(row=error_row, column=4, value=self.timestamp)
-            ws_errors.cell(row=error_row, column=5, value="Revisar y reintentar creación manual")
+        # Ajustar anchos
+        ws_resumen.column_dimensions['A'].width = 30
+        ws_resumen.column_dimensions['B'].width = 12
+        ws_resumen.column_dimensions['C'].width = 12
 
-            for col in range(1, 6):
-                ws_errors.cell(row=error_row, column=col).border = border
+        # Título
+        ws_resumen.append([
+            self._cell(ws_resumen, "Reporte de Automatización de Usuarios", fmt["title"])
+        ])
+        ws_resumen.merged_cells.add('A1:C1')
+        ws_resumen.append([])
 
-            error_row += 1
+        # Información del proceso
+        ws_resumen.append([
+            self._cell(ws_resumen, "Fecha del proceso:", fmt["bold"]),
+            data.get('timestamp', datetime.now().isoformat())
+        ])
+        ws_resumen.append([
+            self._cell(ws_resumen, "Archivo procesado:", fmt["bold"]),
+            os.path.basename(data.get('excel_file') or 'N/A')
+        ])
+        ws_resumen.append([])
 
-        appconnecto_failed = data.get('appconnecto_results', {}).get('failed', [])
-        for user in appconnecto_failed:
-            name = f"{user.get('full_name', '')} {user.get('full_last_name', '')}"
-            ws_errors.cell(row=error_row, column=1, value=name)
-            ws_errors.cell(row=error_row, column=2, value="AppConnecto")
-            ws_errors.cell(row=error_row, column=3, value="Error en creación")
-            ws_errors.cell(row=error_row, column=4, value=self.timestamp)
-            ws_errors.cell(row=error_row, column=5, value="Crear manualmente en AppConnecto")
+        # Tabla de resumen
+        ws_resumen.append([
+            self._cell(ws_resumen, header, fmt["header"])
+            for header in ("Métrica", "Cantidad", "Porcentaje")
+        ])
 
-            for col in range(1, 6):
-                ws_errors.cell(row=error_row, column=col).border = border
+        summary = data.get('summary', {})
+        total = summary.get('total_in_excel', 1)  # Evitar división por cero
 
-            error_row += 1
+        metrics = [
+            ("Total en Excel", summary.get('total_in_excel', 0)),
+            ("Nuevos procesados", summary.get('new_users', 0)),
+            ("Ya existentes", summary.get('existing_users', 0)),
+            ("Creados Office 365", summary.get('office365_created', 0)),
+            ("Creados AppConnecto", summary.get('appconnecto_created', 0)),
+            ("Correos enviados", summary.get('emails_sent', 0)),
+        ]
 
-        email_failed = data.get('email_results', {}).get('failed', [])
-        for item in email_failed:
-            ws_errors.cell(row=error_row, column=1, value=item.get('name', 'N/A'))
-            ws_errors.cell(row=error_row, column=2, value="Email")
-            ws_errors.cell(row=error_row, column=3, value=item.get('error', 'Error desconocido'))
-            ws_errors.cell(row=error_row, column=4, value=self.timestamp)
-            ws_errors.cell(row=error_row, column=5, value="Reenviar credenciales manualmente")
+        for metric, count in metrics:
+            percentage = (count / total * 100) if total > 0 else 0
+            ws_resumen.append([
+                self._cell(ws_resumen, metric, fmt["metric"]),
+                self._cell(ws_resumen, count, fmt["metric_value"]),
+                self._cell(ws_resumen, f"{percentage:.1f}%", fmt["metric_value"]),
+            ])
 
-            for col in range(1, 6):
-                ws_errors.cell(row=error_row, column=col).border = border
+        # HOJA 2 - USUARIOS
+        ws_users = wb.create_sheet("Usuarios")
 
-            error_row += 1
+        self._write_users_sheet(ws_users, data.get('users', []), fmt)
+
+        # HOJA 3 - ERRORES
+        ws_errors = wb.create_sheet("Errores")
 
         # Ajustar anchos
         ws_errors.column_dimensions['A'].width = 30
@@ -541,7 +630,17 @@ class ReportGenerator:
         ws_errors.column_dimensions['D'].width = 20
         ws_errors.column_dimensions['E'].width = 35
 
+        error_headers = ["Usuario", "Plataforma", "Error", "Fecha", "Acción Requerida"]
+        ws_errors.append([self._cell(ws_errors, header, fmt["header"]) for header in error_headers])
+
+        # Recopilar errores
+        bordered = fmt["bordered"]
+        for row in self._iter_errors(data):
+            ws_errors.append([self._cell(ws_errors, value, bordered) for value in row])
+
         # Guardar
+        # Compresión por defecto de openpyxl: re-comprimir el ZIP a un nivel
+        # menor (BytesIO + ZipFile) cuesta más que lo que ahorra
         wb.save(filename)
 
         logger.info(f"✅ Reporte Excel generado: {filename}")
@@ -559,10 +658,13 @@ class ReportGenerator:
         """
         logger.info("Generando reportes PDF y Excel...")
 
-        pdf_path = self.generate_pdf_report(data)
-        excel_path = self.generate_excel_report(data)
+        # Ambos reportes son independientes y solo leen data/self.timestamp:
+        # se generan en paralelo para solapar el render con la escritura/compresión
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pdf_future = executor.submit(self.generate_pdf_report, data)
+            excel_future = executor.submit(self.generate_excel_report, data)
 
-        return {
-            "pdf": pdf_path,
-            "excel": excel_path
-        }
+            return {
+                "pdf": pdf_future.result(),
+                "excel": excel_future.result()
+            }
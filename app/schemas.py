@@ -5,12 +5,32 @@ Este módulo define los schemas de validación para procesar datos
 de estudiantes que provienen de archivos Excel.
 """
 
+import re
 from typing import Optional
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from app.config import get_settings
 
 settings = get_settings()
 
+# Valores permitidos y normalizaciones, construidos una sola vez al importar
+_ALLOWED_REQUEST_TYPES = frozenset(settings.allowed_request_types)
+_ALLOWED_DOCUMENT_TYPES = frozenset(settings.allowed_document_types)
+_ALLOWED_VINCULATION_TYPES = frozenset(settings.allowed_vinculation_types)
+
+# Variaciones comunes del tipo de documento → formato estándar
+_DOCUMENT_MAP = {
+    'CC': 'C.C',
+    'C.C': 'C.C',
+    'C.C.': 'C.C',
+    'CE': 'C.E',
+    'C.E': 'C.E',
+    'C.E.': 'C.E'
+}
+
+# Palabras de apellidos que van en minúscula salvo al inicio (de, del, la,
+# los, las, y). Se aplica sobre palabras separadas por un único espacio.
+_SPECIAL_WORDS_RE = re.compile(r'(?<= )(?:De|Del|La|Los|Las|Y)(?= |$)')
+
 
 class UserSchema(BaseModel):
     """
@@ -68,7 +88,7 @@ class UserSchema(BaseModel):
         normalized = v.strip().title()
 
         # Validar contra valores permitidos
-        if normalized not in settings.allowed_request_types:
+        if normalized not in _ALLOWED_REQUEST_TYPES:
             allowed = ", ".join(settings.allowed_request_types)
             raise ValueError(
                 f"Tipo de solicitud '{v}' no permitido. "
@@ -107,28 +127,11 @@ class UserSchema(BaseModel):
         Returns:
             Apellidos normalizados con formato correcto
         """
-        # Trimear espacios
-        normalized = v.strip().title()
+        # Title case y un solo espacio entre palabras
+        normalized = ' '.join(v.title().split())
 
-        # Palabras que deben ir en minúscula (excepto al inicio)
-        special_words = {'De', 'Del', 'La', 'Los', 'Las', 'Y'}
-
-        # Dividir en palabras
-        words = normalized.split()
-
-        # Procesar cada palabra (excepto la primera)
-        result = []
-        for i, word in enumerate(words):
-            if i == 0:
-                # Primera palabra siempre en title case
-                result.append(word)
-            elif word in special_words:
-                # Palabras especiales en minúscula
-                result.append(word.lower())
-            else:
-                result.append(word)
-
-        return ' '.join(result)
+        # Palabras especiales en minúscula (nunca la primera)
+        return _SPECIAL_WORDS_RE.sub(lambda m: m.group(0).lower(), normalized)
 
     @field_validator('type_document')
     @classmethod
@@ -151,20 +154,10 @@ class UserSchema(BaseModel):
         normalized = v.strip().upper()
 
         # Normalizar variaciones comunes
-        document_map = {
-            'CC': 'C.C',
-            'C.C': 'C.C',
-            'C.C.': 'C.C',
-            'CE': 'C.E',
-            'C.E': 'C.E',
-            'C.E.': 'C.E'
-        }
-
-        # Buscar en el mapa
-        normalized = document_map.get(normalized)
+        normalized = _DOCUMENT_MAP.get(normalized)
 
         # Validar contra valores permitidos
-        if normalized not in settings.allowed_document_types:
+        if normalized not in _ALLOWED_DOCUMENT_TYPES:
             allowed = ", ".join(settings.allowed_document_types)
             raise ValueError(
                 f"Tipo de documento '{v}' no permitido. "
@@ -219,7 +212,7 @@ class UserSchema(BaseModel):
         normalized = v.strip().title()
 
         # Validar contra valores permitidos
-        if normalized not in settings.allowed_vinculation_types:
+        if normalized not in _ALLOWED_VINCULATION_TYPES:
             allowed = ", ".join(settings.allowed_vinculation_types)
             raise ValueError(
                 f"Tipo de vinculación '{v}' no permitido. "
@@ -259,12 +252,12 @@ class UserSchema(BaseModel):
             >>> user.extract_names_for_email()
             >>> print(user.first_name)  # "Laura"
         """
-        # Extraer primer nombre
-        name_parts = self.full_name.split()
+        # Extraer primer nombre (maxsplit: no se separan las palabras que sobran)
+        name_parts = self.full_name.split(None, 1)
         self.first_name = name_parts[0] if name_parts else ""
 
         # Extraer primer y segundo apellido
-        last_name_parts = self.full_last_name.split()
+        last_name_parts = self.full_last_name.split(None, 2)
         self.first_last_name = last_name_parts[0] if last_name_parts else ""
         self.second_last_name = last_name_parts[1] if len(last_name_parts) > 1 else ""
 
@@ -7,12 +7,18 @@ y su asignación a los grupos correspondientes.
 
 import asyncio
 from loguru import logger
-from app.graph_api import GraphAPIClient
+from app.graph_api import BATCH_SIZE, GraphAPIClient
 from app.password_generator import generate_secure_password
 from app.config import get_settings
 
 settings = get_settings()
 
+# Tipo de vinculación → grupo de Office 365
+_GROUP_MAP = {
+    "Estudiante": settings.student_group,
+    "Docente": settings.teacher_group
+}
+
 
 class UserCreator:
     """
@@ -29,6 +35,9 @@ class UserCreator:
             graph_client: Cliente de Graph API configurado
         """
         self.graph_client = graph_client
+        # group_name -> group_id (o None si no existe) durante la vida del creador
+        self._group_ids: dict[str, str | None] = {}
+        self._group_ids_lock = asyncio.Lock()
 
     def _get_group_for_vinculation(self, vinculation_type: str) -> str:
         """
@@ -40,13 +49,69 @@ class UserCreator:
         Returns:
             Nombre del grupo de Office 365
         """
-        if vinculation_type == "Estudiante":
-            return settings.student_group
-        elif vinculation_type == "Docente":
-            return settings.teacher_group
-        else:
+        group = _GROUP_MAP.get(vinculation_type)
+        if group is None:
             logger.warning(f"Tipo de vinculación desconocido: {vinculation_type}. Usando grupo de estudiantes por defecto.")
             return settings.student_group
+        return group
+
+    async def _resolve_group_id(self, group_name: str) -> str | None:
+        """
+        Obtiene el ID del grupo una sola vez por nombre.
+
+        GraphAPIClient.get_group_id ya cachea los grupos encontrados; aquí se
+        recuerda además un grupo inexistente, para no repetir la búsqueda en
+        Graph por cada usuario de la corrida.
+
+        Args:
+            group_name: Nombre del grupo
+
+        Returns:
+            ID del grupo si se encuentra, None en caso contrario
+        """
+        if group_name in self._group_ids:
+            return self._group_ids[group_name]
+
+        async with self._group_ids_lock:
+            # Otra corrutina pudo resolverlo mientras esperábamos el lock
+            if group_name not in self._group_ids:
+                self._group_ids[group_name] = await self.graph_client.get_group_id(group_name)
+            return self._group_ids[group_name]
+
+    async def _await_propagation(
+        self,
+        user_id: str,
+        timeout: float = 20,
+        initial: float = 0.5
+    ) -> bool:
+        """
+        Espera a que un usuario recién creado sea visible en Azure AD.
+
+        Consulta el usuario con backoff exponencial (máximo 2 segundos entre
+        intentos) en lugar de una espera fija.
+
+        Args:
+            user_id: ID del usuario creado
+            timeout: Segundos máximos de espera
+            initial: Espera antes del primer intento
+
+        Returns:
+            True si el usuario quedó visible, False si se agotó el tiempo
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = initial
+
+        while True:
+            await asyncio.sleep(delay)
+            if await self.graph_client.user_exists(user_id):
+                return True
+            if loop.time() + delay >= deadline:
+                break
+            delay = min(delay * 1.5, 2.0)
+
+        logger.warning(f"Usuario {user_id} aún no visible tras {timeout}s; se intenta asignar grupo igualmente")
+        return False
 
     async def _assign_to_group_with_retry(
         self,
@@ -88,12 +153,186 @@ class UserCreator:
         logger.error(f"No se pudo asignar grupo después de {max_attempts} intentos")
         return False
 
+    @staticmethod
+    def _display_name(user: dict) -> str:
+        """
+        Nombre completo del usuario para Office 365.
+
+        Usa el display_name que calcula UserProcessor; si el usuario no viene
+        de process_file lo arma con nombres y apellidos.
+        """
+        return user.get('display_name') or f"{user.get('full_name', '')} {user.get('full_last_name', '')}".strip()
+
+    @staticmethod
+    def _mark_unexpected_error(user: dict, error: Exception) -> None:
+        """Registra en el usuario un error inesperado durante su creación."""
+        user['office365_created'] = False
+        user['password_generated'] = None
+        user['group_assigned'] = None
+        user['creation_error'] = str(error)
+        logger.error(f"Error inesperado creando {user.get('institutional_email')}: {str(error)}")
+
+    async def _create_accounts(self, new_users: list[dict]) -> list[tuple[dict, str, str, str]]:
+        """
+        Crea las cuentas en Office 365 usando /$batch (hasta BATCH_SIZE por request).
+
+        Los usuarios que fallan quedan marcados con creation_error; un error
+        inesperado en un lote solo afecta a los usuarios de ese lote.
+
+        Args:
+            new_users: Usuarios con status="new"
+
+        Returns:
+            Tuplas (usuario, user_id, password, group_name) de los creados
+        """
+        created = []
+
+        for start in range(0, len(new_users), BATCH_SIZE):
+            prepared = []
+            for user in new_users[start:start + BATCH_SIZE]:
+                try:
+                    # Contraseña y grupo según tipo de vinculación
+                    password = generate_secure_password(settings.password_length)
+                    group_name = self._get_group_for_vinculation(user['vinculation_type'])
+                    prepared.append((user, password, group_name))
+                except Exception as e:
+                    self._mark_unexpected_error(user, e)
+
+            try:
+                creation_results = await self.graph_client.bulk_create_users([
+                    {
+                        "display_name": self._display_name(user),
+                        "email": user['institutional_email'],
+                        "password": password
+                    }
+                    for user, password, _ in prepared
+                ])
+            except Exception as e:
+                for user, _, _ in prepared:
+                    self._mark_unexpected_error(user, e)
+                continue
+
+            for (user, password, group_name), creation_result in zip(prepared, creation_results):
+                if creation_result['success']:
+                    created.append((user, creation_result['user_id'], password, group_name))
+                else:
+                    # Error al crear usuario
+                    user['office365_created'] = False
+                    user['password_generated'] = password  # Guardar para reintentar
+                    user['group_assigned'] = None
+                    user['creation_error'] = creation_result.get('error', 'Error desconocido')
+
+        return created
+
+    async def _assign_groups(self, created: list[tuple[dict, str, str, str]]) -> list[dict]:
+        """
+        Asigna los usuarios recién creados a sus grupos.
+
+        Espera la propagación de cada usuario (en paralelo, acotado por
+        graph_create_concurrency), asigna por /$batch agrupando por grupo y
+        reintenta una a una las asignaciones que fallen.
+
+        Args:
+            created: Tuplas (usuario, user_id, password, group_name) de _create_accounts
+
+        Returns:
+            Datos de los usuarios que quedaron creados sin grupo
+        """
+        sem = asyncio.Semaphore(settings.graph_create_concurrency)
+
+        async def resolve(user_id: str, group_name: str) -> str | None:
+            # Esperar propagación en Azure AD (hasta que el usuario sea consultable)
+            async with sem:
+                await self._await_propagation(user_id)
+            return await self._resolve_group_id(group_name)
+
+        logger.info(f"Esperando propagación en Azure AD de {len(created)} usuarios...")
+        group_ids = await asyncio.gather(
+            *(resolve(user_id, group_name) for _, user_id, _, group_name in created),
+            return_exceptions=True
+        )
+
+        # Asignación por /$batch: un grupo a la vez, hasta BATCH_SIZE miembros por request
+        members_by_group: dict[str, list[str]] = {}
+        for (_, user_id, _, _), group_id in zip(created, group_ids):
+            if isinstance(group_id, str):
+                members_by_group.setdefault(group_id, []).append(user_id)
+
+        assigned: dict[str, bool] = {}
+        for group_id, user_ids in members_by_group.items():
+            try:
+                assigned.update(await self.graph_client.bulk_add_members(user_ids, group_id))
+            except Exception as e:
+                logger.warning(f"Batch de asignación a grupo {group_id} falló, se asigna uno a uno: {e}")
+
+        # Las asignaciones fallidas se reintentan individualmente
+        to_retry = [
+            (user_id, group_id, group_name)
+            for (_, user_id, _, group_name), group_id in zip(created, group_ids)
+            if isinstance(group_id, str) and not assigned.get(user_id)
+        ]
+        retried = await asyncio.gather(
+            *(
+                self._assign_to_group_with_retry(
+                    user_id=user_id,
+                    group_id=group_id,
+                    group_name=group_name,
+                    max_attempts=3
+                )
+                for user_id, group_id, group_name in to_retry
+            ),
+            return_exceptions=True
+        )
+        for (user_id, _, _), success in zip(to_retry, retried):
+            assigned[user_id] = success is True
+
+        created_without_group = []
+        for (user, user_id, password, group_name), group_id in zip(created, group_ids):
+            # La cuenta ya existe en Office 365: se conservan su ID y la
+            # contraseña aunque falle la asignación de grupo
+            user['office365_created'] = True
+            user['office365_user_id'] = user_id
+            user['password_generated'] = password
+
+            if isinstance(group_id, BaseException):
+                # Falló la espera de propagación o la búsqueda del grupo
+                user['group_assigned'] = False
+                user['creation_error'] = f"Usuario creado, error asignando grupo: {group_id}"
+                logger.error(
+                    f"Usuario {user['institutional_email']} creado pero error asignando grupo: {group_id}"
+                )
+            elif group_id:
+                group_assigned = assigned.get(user_id, False)
+                user['group_assigned'] = group_name if group_assigned else None
+                user['creation_error'] = None
+                if group_assigned:
+                    continue
+                logger.error(
+                    f"Usuario {user['institutional_email']} creado pero NO asignado a grupo después de 3 intentos"
+                )
+            else:
+                # Usuario creado pero grupo no encontrado
+                user['group_assigned'] = None
+                user['creation_error'] = f"Grupo '{group_name}' no encontrado"
+                logger.error(f"Grupo '{group_name}' no encontrado para {user['institutional_email']}")
+
+            # Guardar en lista de usuarios sin grupo
+            created_without_group.append({
+                "name": self._display_name(user),
+                "email": user['institutional_email'],
+                "user_id": user_id,
+                "password": password,
+                "group_pending": group_name
+            })
+
+        return created_without_group
+
     async def create_users(self, users: list[dict], create_in_office365: bool = True) -> list[dict]:
         """
         Crea usuarios nuevos en Office 365.
 
         Args:
-            users: Lista de usuarios procesados (con status="new" o "existing")
+            users: Lista de usuarios procesados (con status="new" o "existing", ver UserProcessor.process_file)
             create_in_office365: Si False, solo genera datos sin crear en O365
 
         Returns:
@@ -107,113 +346,48 @@ class UserCreator:
             >>> creator = UserCreator(graph_client)
             >>> results = await creator.create_users(users)
         """
-        # Filtrar solo usuarios nuevos
-        new_users = [u for u in users if u.get('status') == 'new']
-        existing_users = [u for u in users if u.get('status') == 'existing']
+        # Separar usuarios nuevos y existentes en una sola pasada
+        new_users = []
+        existing_users = []
+        for u in users:
+            status = u.get('status')
+            if status == 'new':
+                new_users.append(u)
+            elif status == 'existing':
+                existing_users.append(u)
 
         logger.info(f"Creando {len(new_users)} usuarios nuevos (ignorando {len(existing_users)} existentes)")
 
-        results = []
-        created_without_group = []  # Track usuarios creados pero sin grupo
-
-        for user in new_users:
-            try:
-                # Generar contraseña
-                password = generate_secure_password(settings.password_length)
-
-                # Determinar grupo según tipo de vinculación
-                group_name = self._get_group_for_vinculation(user['vinculation_type'])
-
-                if create_in_office365:
-                    # Crear usuario en Office 365
-                    creation_result = await self.graph_client.create_user({
-                        "display_name": f"{user['full_name']} {user['full_last_name']}",
-                        "email": user['institutional_email'],
-                        "password": password
-                    })
-
-                    if creation_result['success']:
-                        user_id = creation_result['user_id']
-
-                        # DELAY: Esperar propagación en Azure AD
-                        logger.info("Usuario creado, esperando 15 segundos para propagación en Azure AD...")
-                        await asyncio.sleep(15)
-
-                        # Obtener ID del grupo
-                        group_id = await self.graph_client.get_group_id(group_name)
-
-                        if group_id:
-                            # Asignar a grupo con reintentos
-                            group_assigned = await self._assign_to_group_with_retry(
-                                user_id=user_id,
-                                group_id=group_id,
-                                group_name=group_name,
-                                max_attempts=3
-                            )
-
-                            # Actualizar datos del usuario
-                            user['office365_created'] = True
-                            user['office365_user_id'] = user_id
-                            user['password_generated'] = password
-                            user['group_assigned'] = group_name if group_assigned else None
-                            user['creation_error'] = None
-
-                            if not group_assigned:
-                                # Guardar en lista de usuarios sin grupo
-                                created_without_group.append({
-                                    "name": f"{user['full_name']} {user['full_last_name']}",
-                                    "email": user['institutional_email'],
-                                    "user_id": user_id,
-                                    "password": password,
-                                    "group_pending": group_name
-                                })
-                                logger.error(
-                                    f"Usuario {user['institutional_email']} creado pero NO asignado a grupo después de 3 intentos"
-                                )
-                        else:
-                            # Usuario creado pero grupo no encontrado
-                            user['office365_created'] = True
-                            user['office365_user_id'] = user_id
-                            user['password_generated'] = password
-                            user['group_assigned'] = None
-                            user['creation_error'] = f"Grupo '{group_name}' no encontrado"
-
-                            # Guardar en lista de usuarios sin grupo
-                            created_without_group.append({
-                                "name": f"{user['full_name']} {user['full_last_name']}",
-                                "email": user['institutional_email'],
-                                "user_id": user_id,
-                                "password": password,
-                                "group_pending": group_name
-                            })
-                            logger.error(f"Grupo '{group_name}' no encontrado para {user['institutional_email']}")
-                    else:
-                        # Error al crear usuario
-                        user['office365_created'] = False
-                        user['password_generated'] = password  # Guardar para reintentar
-                        user['group_assigned'] = None
-                        user['creation_error'] = creation_result.get('error', 'Error desconocido')
-                        logger.error(
-                            f"Error creando usuario {user['institutional_email']}: {user['creation_error']}"
-                        )
-                else:
-                    # Modo simulación: solo generar datos sin crear
-                    user['office365_created'] = False
-                    user['password_generated'] = password
-                    user['group_assigned'] = group_name
-                    user['creation_error'] = None
-                    logger.info(f"[SIMULACIÓN] Usuario {user['institutional_email']} preparado (no creado)")
-
-                results.append(user)
-
-            except Exception as e:
-                # Error inesperado
+        if create_in_office365:
+            created = await self._create_accounts(new_users)
+            created_without_group = await self._assign_groups(created)
+        else:
+            # Modo simulación: solo generar datos sin crear
+            created_without_group = []
+            for user in new_users:
+                try:
+                    password = generate_secure_password(settings.password_length)
+                    group_name = self._get_group_for_vinculation(user['vinculation_type'])
+                except Exception as e:
+                    self._mark_unexpected_error(user, e)
+                    continue
                 user['office365_created'] = False
-                user['password_generated'] = None
-                user['group_assigned'] = None
-                user['creation_error'] = str(e)
-                logger.error(f"Error inesperado creando {user.get('institutional_email')}: {str(e)}")
-                results.append(user)
+                user['password_generated'] = password
+                user['group_assigned'] = group_name
+                user['creation_error'] = None
+                logger.info(f"[SIMULACIÓN] Usuario {user['institutional_email']} preparado (no creado)")
+
+        # Resumen en una sola pasada (los usuarios existentes no cuentan en
+        # ninguna categoría)
+        results = list(new_users)
+        created_with_group = 0
+        errors = 0
+        for user in new_users:
+            was_created = user.get('office365_created')
+            if was_created and user.get('group_assigned'):
+                created_with_group += 1
+            elif was_created is False:
+                errors += 1
 
         # Agregar usuarios existentes sin modificar
         for user in existing_users:
@@ -224,15 +398,7 @@ class UserCreator:
             results.append(user)
 
         # Resumen con tres categorías
-        created_with_group = sum(
-            1 for u in results
-            if u.get('office365_created') and u.get('group_assigned')
-        )
         created_no_group = len(created_without_group)
-        errors = sum(
-            1 for u in results
-            if u.get('office365_created') is False and u.get('status') == 'new'
-        )
 
         logger.info("=" * 80)
         logger.info("RESUMEN DE CREACIÓN")
@@ -7,6 +7,8 @@ Este módulo coordina:
 - Generación de emails institucionales únicos
 """
 
+import asyncio
+import contextlib
 from loguru import logger
 from app.excel_processor import process_excel
 from app.graph_api import get_graph_client
@@ -19,10 +21,10 @@ class UserProcessor:
     Orquesta el procesamiento completo de usuarios.
 
     Flujo:
-    1. Procesar Excel con ExcelProcessor
-    2. Obtener emails existentes de Graph API
+    1. Obtener usuarios existentes de Graph API (en segundo plano)
+    2. Procesar Excel con ExcelProcessor
     3. Generar email institucional para cada usuario
-    4. Retornar usuarios con institutional_email asignado
+    4. Crear los usuarios nuevos en Office 365 (create_new_users)
     """
 
     def __init__(self, domain: str = "ecr.edu.co"):
@@ -56,24 +58,41 @@ class UserProcessor:
         """
         logger.info(f"Iniciando procesamiento completo de archivo: {file_path}")
 
-        # 1. Procesar Excel
-        logger.info("Paso 1/3: Procesando archivo Excel...")
-        users = process_excel(file_path, skip_rows)
+        # 1. Obtener usuarios existentes de Office 365
+        # La descarga (token + paginación, red) arranca primero y corre mientras
+        # el Excel (CPU) se procesa en un hilo, solapando ambos tiempos.
+        logger.info("Paso 1/4: Obteniendo usuarios existentes de Office 365 (en segundo plano)...")
+        existing_task = asyncio.create_task(self.graph_client.get_all_users_info(self.domain))
+
+        # 2. Procesar Excel
+        # Frontera de confianza: process_excel valida cada fila con UserSchema.
+        # De aquí en adelante se trabaja con esos dicts ya validados; no se
+        # vuelve a instanciar el schema (ni a re-ejecutar sus validadores).
+        logger.info("Paso 2/4: Procesando archivo Excel...")
+        try:
+            users = await asyncio.to_thread(process_excel, file_path, skip_rows)
+        except BaseException:
+            # Esperar la cancelación de la descarga para no dejar la tarea
+            # pendiente; el error que se propaga es el del Excel
+            existing_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await existing_task
+            raise
         logger.info(f"✓ {len(users)} usuarios validados desde Excel")
 
-        # 2. Obtener usuarios existentes de Office 365
-        logger.info("Paso 2/3: Obteniendo usuarios existentes de Office 365...")
-        existing_users_info = await self.graph_client.get_all_users_info(self.domain)
+        existing_users_info = await existing_task
         self.email_generator.load_existing_users(existing_users_info)
         logger.info(f"✓ {len(existing_users_info)} usuarios existentes cargados")
 
         # 3. Procesar cada usuario: verificar si existe o generar email nuevo
-        logger.info("Paso 3/3: Verificando usuarios y generando emails...")
+        logger.info("Paso 3/4: Verificando usuarios y generando emails...")
         new_users = 0
         existing_users = 0
 
         for user in users:
-            logger.info(f"Verificando usuario: {user['full_name']} {user['full_last_name']}")
+            # Nombre completo calculado una sola vez; lo reutilizan resúmenes y reportes
+            user['display_name'] = f"{user['full_name']} {user['full_last_name']}"
+            logger.info(f"Verificando usuario: {user['display_name']}")
 
             # Verificar si el usuario ya existe por nombre completo
             existing_email = self.email_generator.check_existing_user(
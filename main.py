@@ -11,24 +11,42 @@ Flujo completo:
 7. Generar reportes en logs/
 
 Uso:
-    python main.py ruta/al/archivo.xlsx
+    python main.py ruta/al/archivo.xlsx [--headless | --no-headless] [--yes] [--pretty]
 """
 
+import argparse
 import asyncio
 import sys
 import json
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
+from typing import Any
 from loguru import logger
 
 from app.config import get_settings
 from app.user_processor import UserProcessor
-from app.graph_api import GraphAPIClient
+from app.graph_api import get_graph_client, close_graph_client
 from app.user_creator import UserCreator
-from app.appconnecto import AppConnectoClient
+from app.appconnecto import AppConnectoClient, shutdown_browser
 from app.email_sender import EmailSender
 from app.report_generator import ReportGenerator
 
+try:
+    import orjson
+
+    def _write_json(path: Path, data: Any, pretty: bool = False) -> None:
+        """Escribe data como JSON (UTF-8) en path; compacto salvo pretty=True."""
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0))
+except ImportError:
+    def _write_json(path: Path, data: Any, pretty: bool = False) -> None:
+        """Escribe data como JSON (UTF-8) en path; compacto salvo pretty=True."""
+        if pretty:
+            payload = json.dumps(data, indent=2, ensure_ascii=False)
+        else:
+            payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+        path.write_bytes(payload.encode('utf-8'))
+
 settings = get_settings()
 
 
@@ -42,46 +60,113 @@ def setup_logging():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_file = logs_dir / f"automation_{timestamp}.log"
 
-    # Configurar loguru
+    # Configurar loguru: enqueue=True escribe el archivo desde un hilo de fondo,
+    # sin bloquear el event loop; diagnose=False evita capturar variables locales
     logger.add(
         log_file,
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
-        level=settings.log_level
+        level=settings.log_level,
+        enqueue=True,
+        backtrace=False,
+        diagnose=False
     )
 
     return logs_dir, timestamp
 
 
+def partition_by_status(users: list) -> defaultdict[str, list]:
+    """
+    Agrupa los usuarios por su campo 'status' en una sola pasada.
+
+    Args:
+        users: Lista de usuarios procesados
+
+    Returns:
+        Dict status -> usuarios con ese status (lista vacía si no hay ninguno),
+        conservando el orden original
+    """
+    groups = defaultdict(list)
+    for user in users:
+        groups[user.get('status')].append(user)
+    return groups
+
+
 def print_summary(new_users: list, existing_users: list):
     """Imprime resumen de usuarios a procesar."""
-    print("\n" + "="*80)
-    print("RESUMEN DE USUARIOS")
-    print("="*80)
-    print(f"\n📊 Total de usuarios en Excel: {len(new_users) + len(existing_users)}")
-    print(f"   ✅ Usuarios nuevos a crear: {len(new_users)}")
-    print(f"   ⚠️  Usuarios que ya existen: {len(existing_users)}")
+    # Se arma el texto completo y se escribe una sola vez (no un print por línea)
+    lines = [
+        "\n" + "="*80,
+        "RESUMEN DE USUARIOS",
+        "="*80,
+        f"\n📊 Total de usuarios en Excel: {len(new_users) + len(existing_users)}",
+        f"   ✅ Usuarios nuevos a crear: {len(new_users)}",
+        f"   ⚠️  Usuarios que ya existen: {len(existing_users)}",
+    ]
 
     if new_users:
-        print("\n👤 USUARIOS NUEVOS:")
+        lines.append("\n👤 USUARIOS NUEVOS:")
         for i, user in enumerate(new_users, 1):
-            print(f"   {i}. {user['full_name']} {user['full_last_name']}")
-            print(f"      📧 Email institucional: {user['institutional_email']}")
-            print(f"      🆔 Documento: {user['identification_id']}")
-            print(f"      👥 Tipo: {user['vinculation_type']}")
+            lines.append(
+                f"   {i}. {user['display_name']}\n"
+                f"      📧 Email institucional: {user['institutional_email']}\n"
+                f"      🆔 Documento: {user['identification_id']}\n"
+                f"      👥 Tipo: {user['vinculation_type']}"
+            )
 
     if existing_users:
-        print("\n⚠️  USUARIOS EXISTENTES (se omitirán):")
+        lines.append("\n⚠️  USUARIOS EXISTENTES (se omitirán):")
         for i, user in enumerate(existing_users, 1):
-            print(f"   {i}. {user['full_name']} {user['full_last_name']}")
-            print(f"      📧 Email existente: {user['institutional_email']}")
+            lines.append(
+                f"   {i}. {user['display_name']}\n"
+                f"      📧 Email existente: {user['institutional_email']}"
+            )
 
-    print("\n" + "="*80)
+    lines.append("\n" + "="*80)
+    print("\n".join(lines))
 
 
-def get_user_confirmation() -> bool:
+def parse_args() -> argparse.Namespace:
+    """
+    Lee y valida los argumentos de línea de comandos.
+
+    Valida el archivo Excel antes de configurar logging o procesar nada,
+    para que una ruta errónea falle de inmediato.
+
+    Returns:
+        Namespace con excel_path, headless (None = preguntar), yes y pretty
+    """
+    parser = argparse.ArgumentParser(description="Automatización de creación de usuarios")
+    parser.add_argument("excel_path", type=Path, help="Ruta al archivo Excel de solicitudes")
+    parser.add_argument(
+        "--headless",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Ejecutar AppConnecto sin navegador visible (si se omite, se pregunta)"
+    )
+    parser.add_argument(
+        "--yes", "-y",
+        action="store_true",
+        help="Confirmar la creación y el envío de correos sin preguntar"
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indentar los reportes JSON para lectura humana"
+    )
+    args = parser.parse_args()
+
+    if not args.excel_path.is_file():
+        parser.error(f"el archivo no existe: {args.excel_path}")
+    if args.excel_path.suffix.lower() not in {'.xlsx', '.xlsm'}:
+        parser.error(f"se esperaba un archivo .xlsx o .xlsm: {args.excel_path}")
+
+    return args
+
+
+async def get_user_confirmation() -> bool:
     """Solicita confirmación del usuario para continuar."""
     while True:
-        response = input("\n¿Desea continuar con la creación de usuarios? (S/N): ").strip().upper()
+        response = (await asyncio.to_thread(input, "\n¿Desea continuar con la creación de usuarios? (S/N): ")).strip().upper()
         if response in ['S', 'SI', 'SÍ', 'Y', 'YES']:
             return True
         elif response in ['N', 'NO']:
@@ -146,22 +231,34 @@ async def process_appconnecto_users(users: list, headless: bool = True) -> dict:
                 "failed": users
             }
 
-        # Crear usuarios uno por uno
-        for i, user in enumerate(users, 1):
-            print(f"\n[{i}/{len(users)}] Procesando: {user['full_name']} {user['full_last_name']}")
+        # Crear usuarios en paralelo (pool de contextos del navegador del cliente)
+        results = await client.create_users(users)
 
-            result = await client.create_user(user)
+        # Los resultados vienen por username (identification_id): se vuelven
+        # a asociar a cada usuario en el orden original
+        already_exist_ids = set(results['already_exists'])
+        created_ids = set(results['created'])
+        errors_by_id = {error['username']: error['error'] for error in results['errors']}
 
-            if result['status'] == 'created':
-                print(f"   ✅ Usuario creado en AppConnecto")
+        lines = []
+        for i, user in enumerate(users, 1):
+            user_id = user['identification_id']
+            header = f"\n[{i}/{len(users)}] {user['display_name']}"
+
+            if user_id in created_ids:
+                lines.append(f"{header}\n   ✅ Usuario creado en AppConnecto")
                 created.append(user)
-            elif result['status'] == 'already_exists':
-                print(f"   ⚠️  Usuario ya existe en AppConnecto")
+            elif user_id in already_exist_ids:
+                lines.append(f"{header}\n   ⚠️  Usuario ya existe en AppConnecto")
                 already_exist.append(user)
             else:
-                print(f"   ❌ Error: {result.get('error', 'Error desconocido')}")
+                error = errors_by_id.get(user_id, 'Error desconocido')
+                lines.append(f"{header}\n   ❌ Error: {error}")
                 failed.append(user)
-                logger.error(f"Error en AppConnecto para {user['identification_id']}: {result.get('error')}")
+                logger.error(f"Error en AppConnecto para {user_id}: {error}")
+
+        if lines:
+            print("\n".join(lines))
 
     finally:
         await client.close()
@@ -190,85 +287,73 @@ async def process_welcome_emails(sender: EmailSender, users: list) -> dict:
 
     results = await sender.send_welcome_emails(users)
 
-    print(f"\n✅ Correos enviados: {len(results['sent'])}")
-    if results['sent']:
-        for user in results['sent']:
-            print(f"   - {user['name']} ({user['email']})")
+    lines = [f"\n✅ Correos enviados: {len(results['sent'])}"]
+    lines.extend(f"   - {user['name']} ({user['email']})" for user in results['sent'])
 
     if results['failed']:
-        print(f"\n❌ Correos fallidos: {len(results['failed'])}")
-        for user in results['failed']:
-            print(f"   - {user['name']} ({user['email']}): {user['error']}")
+        lines.append(f"\n❌ Correos fallidos: {len(results['failed'])}")
+        lines.extend(
+            f"   - {user['name']} ({user['email']}): {user['error']}"
+            for user in results['failed']
+        )
+
+    print("\n".join(lines))
 
     return results
 
 
 def save_reports(logs_dir: Path, timestamp: str, office365_users: list,
-                 appconnecto_results: dict, email_results: dict):
-    """Guarda reportes en archivos JSON."""
+                 appconnecto_results: dict, email_results: dict, pretty: bool = False):
+    """
+    Guarda reportes en archivos JSON.
+
+    Los JSON se consumen desde otros sistemas, por lo que se escriben compactos;
+    con pretty=True se indentan para lectura humana.
+    """
     print("\n" + "="*80)
     print("💾 GUARDANDO REPORTES")
     print("="*80)
 
+    # Estructura única con todas las secciones; los reportes por fase son
+    # vistas sobre ella, sin volver a recorrer ni copiar los datos
+    def person_refs(users: list) -> list[dict]:
+        return [{"name": u['display_name'], "identification_id": u['identification_id']} for u in users]
+
+    appconnecto_view = {
+        key: person_refs(appconnecto_results[key])
+        for key in ('created', 'already_exist', 'failed')
+    }
+    report = {
+        "timestamp": timestamp,
+        "office365": {
+            "total": len(office365_users),
+            "users": office365_users
+        },
+        "appconnecto": {key: len(refs) for key, refs in appconnecto_view.items()},
+        "emails": {
+            "sent": len(email_results['sent']),
+            "failed": len(email_results['failed'])
+        }
+    }
+
     # Reporte de usuarios creados en Office 365
     office365_report = logs_dir / f"usuarios_office365_{timestamp}.json"
-    with open(office365_report, 'w', encoding='utf-8') as f:
-        json.dump(office365_users, f, indent=2, ensure_ascii=False)
+    _write_json(office365_report, report['office365']['users'], pretty)
     print(f"✅ Reporte Office 365: {office365_report}")
 
     # Reporte de AppConnecto
     appconnecto_report = logs_dir / f"usuarios_appconnecto_{timestamp}.json"
-    with open(appconnecto_report, 'w', encoding='utf-8') as f:
-        json.dump({
-            "created": [
-                {
-                    "name": f"{u['full_name']} {u['full_last_name']}",
-                    "identification_id": u['identification_id']
-                }
-                for u in appconnecto_results['created']
-            ],
-            "already_exist": [
-                {
-                    "name": f"{u['full_name']} {u['full_last_name']}",
-                    "identification_id": u['identification_id']
-                }
-                for u in appconnecto_results['already_exist']
-            ],
-            "failed": [
-                {
-                    "name": f"{u['full_name']} {u['full_last_name']}",
-                    "identification_id": u['identification_id']
-                }
-                for u in appconnecto_results['failed']
-            ]
-        }, f, indent=2, ensure_ascii=False)
+    _write_json(appconnecto_report, appconnecto_view, pretty)
     print(f"✅ Reporte AppConnecto: {appconnecto_report}")
 
     # Reporte de correos
     email_report = logs_dir / f"correos_enviados_{timestamp}.json"
-    with open(email_report, 'w', encoding='utf-8') as f:
-        json.dump(email_results, f, indent=2, ensure_ascii=False)
+    _write_json(email_report, email_results, pretty)
     print(f"✅ Reporte correos: {email_report}")
 
     # Reporte consolidado
     consolidated_report = logs_dir / f"reporte_consolidado_{timestamp}.json"
-    with open(consolidated_report, 'w', encoding='utf-8') as f:
-        json.dump({
-            "timestamp": timestamp,
-            "office365": {
-                "total": len(office365_users),
-                "users": office365_users
-            },
-            "appconnecto": {
-                "created": len(appconnecto_results['created']),
-                "already_exist": len(appconnecto_results['already_exist']),
-                "failed": len(appconnecto_results['failed'])
-            },
-            "emails": {
-                "sent": len(email_results['sent']),
-                "failed": len(email_results['failed'])
-            }
-        }, f, indent=2, ensure_ascii=False)
+    _write_json(consolidated_report, report, pretty)
     print(f"✅ Reporte consolidado: {consolidated_report}")
 
 
@@ -298,12 +383,8 @@ def print_final_summary(office365_users: list, appconnecto_results: dict, email_
 async def main():
     """Función principal del script."""
     # Verificar argumentos
-    if len(sys.argv) < 2:
-        print("❌ Error: Debe proporcionar la ruta del archivo Excel")
-        print("Uso: python main.py ruta/al/archivo.xlsx")
-        sys.exit(1)
-
-    excel_path = sys.argv[1]
+    args = parse_args()
+    excel_path = str(args.excel_path)
 
     # Configurar logging
     logs_dir, timestamp = setup_logging()
@@ -318,8 +399,9 @@ async def main():
         all_users = await processor.process_file(excel_path, skip_rows=0)
 
         # 2. Separar usuarios nuevos y existentes (usando el campo 'status')
-        new_users = [u for u in all_users if u.get('status') == 'new']
-        existing_users = [u for u in all_users if u.get('status') == 'existing']
+        users_by_status = partition_by_status(all_users)
+        new_users = users_by_status['new']
+        existing_users = users_by_status['existing']
 
         # 3. Mostrar resumen y solicitar confirmación
         print_summary(new_users, existing_users)
@@ -374,13 +456,13 @@ async def main():
             logger.info("Proceso finalizado - No había usuarios nuevos")
             return
 
-        if not get_user_confirmation():
+        if not args.yes and not await get_user_confirmation():
             print("\n❌ Proceso cancelado por el usuario.")
             return
 
         # 4. Inicializar clientes
         print("\n🔐 Autenticando con servicios...")
-        graph_client = GraphAPIClient()
+        graph_client = get_graph_client()
         user_creator = UserCreator(graph_client)
         email_sender = EmailSender(graph_client)
 
@@ -394,30 +476,46 @@ async def main():
 
         print(f"\n✅ {len(office365_users)} usuarios creados exitosamente en Office 365")
 
-        # 6. Crear usuarios en AppConnecto
-        # Preguntar si desea modo headless
-        headless_response = input("\n¿Ejecutar AppConnecto en modo headless (sin navegador visible)? (S/N): ").strip().upper()
-        headless = headless_response in ['S', 'SI', 'SÍ', 'Y', 'YES']
-
-        appconnecto_results = await process_appconnecto_users(office365_users, headless=headless)
+        # 6-7. AppConnecto y correos de bienvenida solo dependen de Office 365,
+        # no entre sí: se hacen las preguntas primero y ambas fases corren en paralelo
+        headless = args.headless
+        if headless is None:
+            headless_response = (await asyncio.to_thread(
+                input, "\n¿Ejecutar AppConnecto en modo headless (sin navegador visible)? (S/N): "
+            )).strip().upper()
+            headless = headless_response in ['S', 'SI', 'SÍ', 'Y', 'YES']
 
-        # 7. Enviar correos de bienvenida
-        # Solo a usuarios creados exitosamente en Office 365 con password_generated
+        # Correos solo a usuarios creados exitosamente en Office 365 con password_generated
         users_for_email = [u for u in office365_users if u.get('password_generated')]
+        send_emails = False
 
         if users_for_email:
-            email_response = input("\n¿Desea enviar correos de bienvenida ahora? (S/N): ").strip().upper()
-            if email_response in ['S', 'SI', 'SÍ', 'Y', 'YES']:
-                email_results = await process_welcome_emails(email_sender, users_for_email)
+            if args.yes:
+                send_emails = True
             else:
+                email_response = (await asyncio.to_thread(
+                    input, "\n¿Desea enviar correos de bienvenida ahora? (S/N): "
+                )).strip().upper()
+                send_emails = email_response in ['S', 'SI', 'SÍ', 'Y', 'YES']
+            if not send_emails:
                 print("\n⚠️  Envío de correos omitido.")
-                email_results = {"sent": [], "failed": [], "total": 0}
         else:
             print("\n⚠️  No hay usuarios para enviar correos.")
+
+        if send_emails:
+            appconnecto_results, email_results = await asyncio.gather(
+                process_appconnecto_users(office365_users, headless=headless),
+                process_welcome_emails(email_sender, users_for_email)
+            )
+        else:
+            appconnecto_results = await process_appconnecto_users(office365_users, headless=headless)
             email_results = {"sent": [], "failed": [], "total": 0}
 
         # 8. Guardar reportes JSON
-        save_reports(logs_dir, timestamp, office365_users, appconnecto_results, email_results)
+        save_reports(
+            logs_dir, timestamp, office365_users, appconnecto_results, email_results,
+            pretty=args.pretty or settings.report_json_pretty
+        )
 
         # 9. Mostrar resumen final
         print_final_summary(office365_users, appconnecto_results, email_results)
@@ -441,7 +539,7 @@ async def main():
             },
             "office365_results": {
                 "created": office365_users,
-                "failed": [u for u in all_users if u.get('status') == 'new' and not u.get('office365_created')]
+                "failed": [u for u in new_users if not u.get('office365_created')]
             },
             "appconnecto_results": appconnecto_results,
             "email_results": email_results
@@ -462,12 +560,17 @@ async def main():
         logger.info("Proceso completado exitosamente")
 
     except Exception as e:
-        logger.error(f"❌ Error en el proceso principal: {e}")
+        # logger.exception adjunta el traceback una sola vez en los sinks configurados
+        logger.exception(f"❌ Error en el proceso principal: {e}")
         print(f"\n❌ ERROR: {e}")
-        import traceback
-        traceback.print_exc()
         sys.exit(1)
 
+    finally:
+        await shutdown_browser()
+        await close_graph_client()
+        # Vaciar la cola del sink de archivo antes de salir
+        await logger.complete()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -9,7 +9,8 @@ import asyncio
 from pathlib import Path
 from loguru import logger
 from app.user_processor import UserProcessor
-from app.appconnecto import AppConnectoClient
+from app.appconnecto import AppConnectoClient, shutdown_browser
+from app.graph_api import close_graph_client
 
 
 def print_summary(results: dict) -> None:
@@ -127,6 +128,7 @@ async def main():
         finally:
             # Cerrar navegador
             await client.close()
+            await shutdown_browser()
 
         # Nota final
         print()
@@ -144,10 +146,11 @@ async def main():
         print(f"Mensaje: {str(e)}")
         print()
 
-        # Mostrar traceback completo
-        import traceback
-        print("Traceback:")
-        traceback.print_exc()
+        # Traceback completo vía loguru
+        logger.exception("Detalle del error")
+
+    finally:
+        await close_graph_client()
 
 
 if __name__ == "__main__":
@@ -7,9 +7,14 @@ para cada estudiante, verificando contra Office 365.
 
 import asyncio
 import json
+from collections import Counter, defaultdict
 from pathlib import Path
 from loguru import logger
 from app.user_processor import process_users
+from app.graph_api import close_graph_client
+
+# Caracteres cuya presencia indica que se aplicó eliminación de tildes
+ACCENT_CHARS = frozenset('áéíóúÁÉÍÓÚñÑ')
 
 
 async def main():
@@ -69,8 +74,9 @@ async def main():
         print()
 
         # Resumen de usuarios
-        new_count = sum(1 for u in users if u.get('status') == 'new')
-        existing_count = sum(1 for u in users if u.get('status') == 'existing')
+        status_counts = Counter(u.get('status') for u in users)
+        new_count = status_counts['new']
+        existing_count = status_counts['existing']
 
         print("=" * 80)
         print("RESUMEN")
@@ -85,12 +91,9 @@ async def main():
         print("ANÁLISIS DE DUPLICADOS:")
         print()
 
-        name_counts: dict[str, list[dict]] = {}
+        name_counts: defaultdict[str, list[dict]] = defaultdict(list)
         for user in users:
-            key = f"{user['first_name']} {user['first_last_name']}"
-            if key not in name_counts:
-                name_counts[key] = []
-            name_counts[key].append(user)
+            name_counts[f"{user['first_name']} {user['first_last_name']}"].append(user)
 
         duplicates_found = False
         for name, user_list in name_counts.items():
@@ -115,7 +118,7 @@ async def main():
             normalizations = []
 
             # Detectar si tiene tildes en el nombre original
-            if any(c in user['full_name'] for c in 'áéíóúÁÉÍÓÚñÑ'):
+            if not ACCENT_CHARS.isdisjoint(user['full_name']):
                 normalizations.append("eliminación de tildes")
 
             # Detectar si el email tiene sufijo del segundo apellido
@@ -144,10 +147,11 @@ async def main():
         print(f"Mensaje: {str(e)}")
         print()
 
-        # Mostrar traceback completo si es útil
-        import traceback
-        print("Traceback:")
-        traceback.print_exc()
+        # Traceback completo vía loguru
+        logger.exception("Detalle del error")
+
+    finally:
+        await close_graph_client()
 
 
 if __name__ == "__main__":
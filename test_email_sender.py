@@ -6,9 +6,10 @@ Lee usuarios desde logs/usuarios_creados.json y envía correos a sus emails pers
 
 import asyncio
 import json
+import sys
 from pathlib import Path
 from loguru import logger
-from app.graph_api import get_graph_client
+from app.graph_api import get_graph_client, close_graph_client
 from app.email_sender import EmailSender
 
 
@@ -103,18 +104,19 @@ async def main():
             print(f"   Password Office 365: {user['password_generated']}")
             print()
 
-        # Paso 2: Mostrar preview del primer correo
-        print("=" * 80)
-        print("PREVIEW DEL CORREO (primer usuario)")
-        print("=" * 80)
-        print()
-
         graph_client = get_graph_client()
         sender = EmailSender(graph_client)
 
-        first_user_html = sender.render_welcome_email(users[0])
-        print(first_user_html)
-        print()
+        # Paso 2: Mostrar preview del primer correo (solo en terminal interactiva)
+        if sys.stdout.isatty():
+            print("=" * 80)
+            print("PREVIEW DEL CORREO (primer usuario)")
+            print("=" * 80)
+            print()
+
+            first_user_html = sender.render_welcome_email(users[0])
+            print(first_user_html)
+            print()
 
         # Paso 3: Pedir confirmación
         print("=" * 80)
@@ -154,10 +156,11 @@ async def main():
         print(f"Mensaje: {str(e)}")
         print()
 
-        # Mostrar traceback completo
-        import traceback
-        print("Traceback:")
-        traceback.print_exc()
+        # Traceback completo vía loguru
+        logger.exception("Detalle del error")
+
+    finally:
+        await close_graph_client()
 
 
 if __name__ == "__main__":
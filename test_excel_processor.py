@@ -5,10 +5,32 @@ Procesa el archivo Excel de prueba y muestra los resultados,
 guardando también un JSON con los usuarios procesados.
 """
 
-import json
+import sys
+import orjson
 from pathlib import Path
 from app.excel_processor import process_excel, ExcelProcessorError
 
+# Palabras de apellido compuesto (se comparan como palabras completas, no subcadenas)
+SPECIAL_WORDS = frozenset({'de', 'del', 'la', 'los', 'las', 'y'})
+
+# (etiqueta, campo) mostrados por usuario
+USER_FIELDS = (
+    ("Tipo solicitud", 'request_type'),
+    ("Nombre completo", 'full_name'),
+    ("Apellido completo", 'full_last_name'),
+    ("Tipo documento", 'type_document'),
+    ("Número ID", 'identification_id'),
+    ("Vinculación", 'vinculation_type'),
+    ("Programa", 'academic_program'),
+    ("Email personal", 'email_personal'),
+    ("Primer nombre", 'first_name'),
+    ("Primer apellido", 'first_last_name'),
+)
+# Plantilla armada una sola vez; el segundo apellido va entre comillas para ver si está vacío
+USER_TEMPLATE = "".join(
+    f"  {label + ':':<21}{{{key}}}\n" for label, key in USER_FIELDS
+) + f"  {'Segundo apellido:':<21}'{{second_last_name}}'\n"
+
 
 def test_excel_processor():
     """Prueba el procesador de Excel con archivo de prueba."""
@@ -43,21 +65,9 @@ def test_excel_processor():
         print("=" * 80)
         print()
 
-        # Mostrar cada usuario
+        # Mostrar cada usuario (una sola escritura por usuario)
         for i, user in enumerate(users, 1):
-            print(f"Usuario {i}:")
-            print(f"  Tipo solicitud:      {user['request_type']}")
-            print(f"  Nombre completo:     {user['full_name']}")
-            print(f"  Apellido completo:   {user['full_last_name']}")
-            print(f"  Tipo documento:      {user['type_document']}")
-            print(f"  Número ID:           {user['identification_id']}")
-            print(f"  Vinculación:         {user['vinculation_type']}")
-            print(f"  Programa:            {user['academic_program']}")
-            print(f"  Email personal:      {user['email_personal']}")
-            print(f"  Primer nombre:       {user['first_name']}")
-            print(f"  Primer apellido:     {user['first_last_name']}")
-            print(f"  Segundo apellido:    '{user['second_last_name']}'")
-            print()
+            sys.stdout.write(f"Usuario {i}:\n{USER_TEMPLATE.format_map(user)}\n")
 
         # Crear directorio logs si no existe
         logs_dir = Path("logs")
@@ -65,8 +75,7 @@ def test_excel_processor():
 
         # Guardar JSON
         output_file = logs_dir / "usuarios_procesados.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(users, f, ensure_ascii=False, indent=2)
+        output_file.write_bytes(orjson.dumps(users, option=orjson.OPT_INDENT_2))
 
         print("=" * 80)
         print(f"💾 JSON guardado en: {output_file}")
@@ -78,21 +87,21 @@ def test_excel_processor():
         print()
 
         for i, user in enumerate(users, 1):
-            print(f"Usuario {i}:")
+            lines = [f"Usuario {i}:"]
 
             # Verificar apellidos con palabras especiales
-            if any(word in user['full_last_name'].lower() for word in ['de', 'del', 'la', 'los', 'las', 'y']):
-                print(f"  ✓ Apellido con palabras especiales: {user['full_last_name']}")
+            if not SPECIAL_WORDS.isdisjoint(user['full_last_name'].lower().split()):
+                lines.append(f"  ✓ Apellido con palabras especiales: {user['full_last_name']}")
 
             # Verificar segundo apellido vacío
             if user['second_last_name'] == "":
-                print(f"  ✓ Sin segundo apellido")
+                lines.append("  ✓ Sin segundo apellido")
 
             # Verificar tipo documento normalizado
             if user['type_document'] in ['C.C', 'C.E']:
-                print(f"  ✓ Tipo documento normalizado: {user['type_document']}")
+                lines.append(f"  ✓ Tipo documento normalizado: {user['type_document']}")
 
-            print()
+            sys.stdout.write("\n".join(lines) + "\n\n")
 
     except ExcelProcessorError as e:
         print("❌ Error al procesar Excel:")
@@ -1,13 +1,17 @@
 import asyncio
 from loguru import logger
 import sys
-from app.graph_api import get_graph_client
+from app.graph_api import get_graph_client, close_graph_client
 
-# Configurar logging
+# Configurar logging: toda la salida pasa por loguru, así que puede escribirse
+# desde un hilo de fondo (enqueue) sin desordenarse
 logger.remove()
 logger.add(
     sys.stdout,
-    colorize=True,
+    colorize=sys.stdout.isatty(),
+    enqueue=True,
+    backtrace=False,
+    diagnose=False,
     format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>"
 )
 
@@ -23,7 +27,7 @@ async def test_connection():
         
         # Test 1: Obtener token
         logger.info("\n1️⃣  Obteniendo token de autenticación...")
-        token = client.get_token()
+        token = await client.get_token()
         logger.success(f"✅ Token obtenido (primeros 30 chars): {token[:30]}...")
         
         # Test 2: Listar usuarios
@@ -61,6 +65,17 @@ async def test_connection():
         logger.error("  3. AZURE_CLIENT_SECRET correcto en .env")
         logger.error("  4. Permisos concedidos en Azure Portal\n")
 
+    finally:
+        await close_graph_client()
+        await logger.complete()
+
 
 if __name__ == "__main__":
+    # uvloop (incluido en uvicorn[standard]) acelera el event loop; no existe en Windows
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     asyncio.run(test_connection())
\ No newline at end of file
@@ -22,7 +22,7 @@ def test_case(name: str, data: dict, should_fail: bool = False) -> bool:
         bool: True si el test pasó correctamente
     """
     try:
-        user = UserSchema(**data)
+        user = UserSchema.model_validate(data)
         user.extract_names_for_email()
 
         if should_fail:
@@ -63,6 +63,49 @@ def test_case(name: str, data: dict, should_fail: bool = False) -> bool:
             return False
 
 
+# Datos base válidos; cada caso define solo los campos que cambia
+BASE_VALID_DATA = {
+    "request_type": "Apertura",
+    "full_name": "Juan Carlos",
+    "full_last_name": "Perez Lopez",
+    "type_document": "C.C",
+    "identification_id": "123456789",
+    "vinculation_type": "Estudiante",
+    "academic_program": "FISIOTERAPIA",
+    "email_personal": "test@gmail.com"
+}
+
+# (nombre, campos sobre BASE_VALID_DATA, should_fail)
+CASES = [
+    ("Caso 1: Usuario válido completo", {
+        "full_name": "LAURA SOFIA",
+        "full_last_name": "BECERRA SANDOVAL",
+        "identification_id": "1000227618",
+        "academic_program": "ESPECIALIZACIÓN: FISIOTERAPIA EN NEUROREHABILITACIÓN",
+        "email_personal": "sofiabecerra251@gmail.com"
+    }, False),
+    ("Caso 2: Normalización de mayúsculas/minúsculas", {
+        "full_name": "maría josé",
+        "full_last_name": "rodriguez lopez"
+    }, False),
+    ("Caso 3: Apellidos con palabras especiales", {"full_last_name": "SILVA DE LA CRUZ"}, False),
+    ("Caso 4: Apellido sin segundo nombre", {"full_last_name": "Gomez"}, False),
+    ("Caso 5: Normalización de tipo documento (CC -> C.C)", {"type_document": "CC"}, False),
+    ("Caso 6: ID sin padding de ceros", {"identification_id": "123"}, False),
+    ("Caso 7: Trimeo de espacios extra", {"full_name": "  Pedro  ", "identification_id": "  456  "}, False),
+    ("Caso 8: ERROR - ID con letras", {"identification_id": "abc123"}, True),
+    ("Caso 9: ERROR - Email inválido", {"email_personal": "not-an-email"}, True),
+    ("Caso 10: ERROR - Tipo solicitud inválido", {"request_type": "Actualización"}, True),
+]
+
+# Otras variaciones de documento y apellidos
+EXTRA_CASES = [
+    ("Caso Extra 1: Tipo documento C.E (Cédula de Extranjería)", {"type_document": "CE"}, False),
+    ("Caso Extra 2: Apellido con 'Y' (Silva y Rodriguez)", {"full_last_name": "SILVA Y RODRIGUEZ"}, False),
+    ("Caso Extra 3: Apellido con 'Del' (Del Carmen)", {"full_last_name": "DEL CARMEN RODRIGUEZ"}, False),
+]
+
+
 def run_tests():
     """Ejecuta todos los casos de prueba."""
 
@@ -71,120 +114,11 @@ def run_tests():
     print("=" * 70)
     print()
 
-    results = []
-
-    # Datos base válidos para reutilizar
-    base_valid_data = {
-        "request_type": "Apertura",
-        "full_name": "Juan Carlos",
-        "full_last_name": "Perez Lopez",
-        "type_document": "C.C",
-        "identification_id": "123456789",
-        "vinculation_type": "Estudiante",
-        "academic_program": "FISIOTERAPIA",
-        "email_personal": "test@gmail.com"
-    }
-
-    # CASO 1: Usuario válido completo
-    results.append(test_case(
-        "Caso 1: Usuario válido completo",
-        {
-            "request_type": "Apertura",
-            "full_name": "LAURA SOFIA",
-            "full_last_name": "BECERRA SANDOVAL",
-            "type_document": "C.C",
-            "identification_id": "1000227618",
-            "vinculation_type": "Estudiante",
-            "academic_program": "ESPECIALIZACIÓN: FISIOTERAPIA EN NEUROREHABILITACIÓN",
-            "email_personal": "sofiabecerra251@gmail.com"
-        }
-    ))
-
-    # CASO 2: Normalización de mayúsculas/minúsculas
-    results.append(test_case(
-        "Caso 2: Normalización de mayúsculas/minúsculas",
-        {
-            **base_valid_data,
-            "full_name": "maría josé",
-            "full_last_name": "rodriguez lopez"
-        }
-    ))
-
-    # CASO 3: Apellidos con palabras especiales
-    results.append(test_case(
-        "Caso 3: Apellidos con palabras especiales",
-        {
-            **base_valid_data,
-            "full_last_name": "SILVA DE LA CRUZ"
-        }
-    ))
-
-    # CASO 4: Apellido sin segundo nombre
-    results.append(test_case(
-        "Caso 4: Apellido sin segundo nombre",
-        {
-            **base_valid_data,
-            "full_last_name": "Gomez"
-        }
-    ))
-
-    # CASO 5: Normalización de tipo documento
-    results.append(test_case(
-        "Caso 5: Normalización de tipo documento (CC -> C.C)",
-        {
-            **base_valid_data,
-            "type_document": "CC"
-        }
-    ))
-
-    # CASO 6: ID sin padding
-    results.append(test_case(
-        "Caso 6: ID sin padding de ceros",
-        {
-            **base_valid_data,
-            "identification_id": "123"
-        }
-    ))
-
-    # CASO 7: Espacios extra
-    results.append(test_case(
-        "Caso 7: Trimeo de espacios extra",
-        {
-            **base_valid_data,
-            "full_name": "  Pedro  ",
-            "identification_id": "  456  "
-        }
-    ))
-
-    # CASO 8: ERROR - ID con letras
-    results.append(test_case(
-        "Caso 8: ERROR - ID con letras",
-        {
-            **base_valid_data,
-            "identification_id": "abc123"
-        },
-        should_fail=True
-    ))
-
-    # CASO 9: ERROR - Email inválido
-    results.append(test_case(
-        "Caso 9: ERROR - Email inválido",
-        {
-            **base_valid_data,
-            "email_personal": "not-an-email"
-        },
-        should_fail=True
-    ))
-
-    # CASO 10: ERROR - Tipo solicitud inválido
-    results.append(test_case(
-        "Caso 10: ERROR - Tipo solicitud inválido",
-        {
-            **base_valid_data,
-            "request_type": "Actualización"
-        },
-        should_fail=True
-    ))
+    total = len(CASES) + len(EXTRA_CASES)
+    passed = 0
+
+    for name, overrides, should_fail in CASES:
+        passed += test_case(name, {**BASE_VALID_DATA, **overrides}, should_fail)
 
     # CASOS ADICIONALES: Validar otras variaciones de documento
     print("=" * 70)
@@ -192,38 +126,14 @@ def run_tests():
     print("=" * 70)
     print()
 
-    results.append(test_case(
-        "Caso Extra 1: Tipo documento C.E (Cédula de Extranjería)",
-        {
-            **base_valid_data,
-            "type_document": "CE"
-        }
-    ))
-
-    results.append(test_case(
-        "Caso Extra 2: Apellido con 'Y' (Silva y Rodriguez)",
-        {
-            **base_valid_data,
-            "full_last_name": "SILVA Y RODRIGUEZ"
-        }
-    ))
-
-    results.append(test_case(
-        "Caso Extra 3: Apellido con 'Del' (Del Carmen)",
-        {
-            **base_valid_data,
-            "full_last_name": "DEL CARMEN RODRIGUEZ"
-        }
-    ))
+    for name, overrides, should_fail in EXTRA_CASES:
+        passed += test_case(name, {**BASE_VALID_DATA, **overrides}, should_fail)
 
     # RESUMEN
     print("=" * 70)
     print("RESUMEN DE RESULTADOS")
     print("=" * 70)
 
-    passed = sum(results)
-    total = len(results)
-
     print(f"\nCasos pasados: {passed}/{total}")
 
     if passed == total:
@@ -6,10 +6,13 @@ pide confirmación y crea los usuarios en Office 365.
 """
 
 import asyncio
-import json
+import os
+import sys
+import orjson
 from pathlib import Path
 from loguru import logger
 from app.user_processor import UserProcessor
+from app.graph_api import close_graph_client
 
 
 async def main():
@@ -22,8 +25,10 @@ async def main():
 
     # Configurar logging
     logger.remove()  # Remover handler por defecto
+    # Sin enqueue: los logs se intercalan con print() y deben salir en orden
     logger.add(
-        lambda msg: print(msg, end=""),
+        sys.stdout,
+        colorize=sys.stdout.isatty(),
         format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>",
         level="INFO"
     )
@@ -36,9 +41,15 @@ async def main():
         processor = UserProcessor()
         users = await processor.process_file("Solicitud correos prueba.xlsx")
 
-        # Filtrar usuarios nuevos
-        new_users = [u for u in users if u.get('status') == 'new']
-        existing_users = [u for u in users if u.get('status') == 'existing']
+        # Separar usuarios nuevos y existentes en una sola pasada
+        new_users = []
+        existing_users = []
+        for u in users:
+            status = u.get('status')
+            if status == 'new':
+                new_users.append(u)
+            elif status == 'existing':
+                existing_users.append(u)
 
         print()
         print("=" * 80)
@@ -62,7 +73,14 @@ async def main():
 
         # Pedir confirmación
         print("=" * 80)
-        response = input(f"¿Crear estos {len(new_users)} usuarios en Office 365? (s/n): ").strip().lower()
+        # Sin terminal no se bloquea en input(): AUTO_CONFIRM=1 confirma, si no se cancela
+        if os.environ.get('AUTO_CONFIRM') == '1':
+            response = 's'
+        elif not sys.stdin.isatty():
+            print("⚠️  Entrada no interactiva: defina AUTO_CONFIRM=1 para confirmar")
+            response = 'n'
+        else:
+            response = input(f"¿Crear estos {len(new_users)} usuarios en Office 365? (s/n): ").strip().lower()
         print()
 
         if response != 's':
@@ -87,8 +105,12 @@ async def main():
 
         created_count = 0
         error_count = 0
+        created_with_group = 0
 
         for user in users_created:
+            if user.get('office365_created') and user.get('group_assigned'):
+                created_with_group += 1
+
             if user.get('status') == 'new':
                 if user.get('office365_created'):
                     created_count += 1
@@ -109,30 +131,24 @@ async def main():
         logs_dir.mkdir(exist_ok=True)
 
         output_file = logs_dir / "usuarios_creados.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(users_created, f, ensure_ascii=False, indent=2)
+        output_file.write_bytes(orjson.dumps(users_created, option=orjson.OPT_INDENT_2))
 
         print("=" * 80)
         print(f"💾 JSON guardado en: {output_file}")
         print("=" * 80)
         print()
 
-        # Resumen final con tres categorías
-        created_with_group = sum(
-            1 for u in users_created
-            if u.get('office365_created') and u.get('group_assigned')
+        # Resumen final con tres categorías (created_with_group se contó arriba)
+        # Extraer lista de usuarios sin grupo: primer registro que la traiga
+        created_without_group_list = next(
+            (
+                pending for u in users_created
+                if (pending := u.get('created_without_group_list')
+                    or (u.get('status') == 'metadata' and u.get('created_without_group')))
+            ),
+            []
         )
 
-        # Extraer lista de usuarios sin grupo
-        created_without_group_list = []
-        for user in users_created:
-            if user.get('created_without_group_list'):
-                created_without_group_list = user['created_without_group_list']
-                break
-            elif user.get('status') == 'metadata' and user.get('created_without_group'):
-                created_without_group_list = user['created_without_group']
-                break
-
         print("=" * 80)
         print("RESUMEN")
         print("=" * 80)
@@ -168,11 +184,19 @@ async def main():
         print(f"Mensaje: {str(e)}")
         print()
 
-        # Mostrar traceback completo
-        import traceback
-        print("Traceback:")
-        traceback.print_exc()
+        # Traceback completo vía loguru
+        logger.exception("Detalle del error")
+
+    finally:
+        await close_graph_client()
 
 
 if __name__ == "__main__":
+    # uvloop (incluido en uvicorn[standard]) acelera el event loop; no existe en Windows
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     asyncio.run(main())
@@ -5,7 +5,7 @@ Genera tests/fixtures/estudiantes_test.xlsx con 5 filas variadas
 para probar el ExcelProcessor.
 """
 
-import pandas as pd
+from openpyxl import Workbook
 from pathlib import Path
 
 
@@ -72,8 +72,9 @@ def create_test_excel():
         ]
     }
 
-    # Crear DataFrame
-    df = pd.DataFrame(data)
+    # Filas en el mismo orden de columnas que los encabezados
+    headers = list(data)
+    rows = list(zip(*data.values()))
 
     # Crear directorio si no existe
     output_dir = Path(__file__).parent / "fixtures"
@@ -81,12 +82,18 @@ def create_test_excel():
 
     # Guardar Excel
     output_file = output_dir / "estudiantes_test.xlsx"
-    df.to_excel(output_file, index=False, engine='openpyxl')
+    # write_only escribe las filas en streaming, sin armar el árbol de celdas en memoria
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(headers)
+    for row in rows:
+        ws.append(row)
+    wb.save(output_file)
 
     print(f"✅ Excel de prueba creado exitosamente")
     print(f"📁 Ubicación: {output_file}")
-    print(f"📊 Filas: {len(df)}")
-    print(f"📋 Columnas: {len(df.columns)}")
+    print(f"📊 Filas: {len(rows)}")
+    print(f"📋 Columnas: {len(headers)}")
     print()
     print("Casos de prueba incluidos:")
     print("  - Normalización de mayúsculas/minúsculas")